@@ -1,15 +1,25 @@
+import time
+import uuid
+
+# Time the whole script run, including the first-run imports below
+run_start = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-from streamlit_lottie import st_lottie
-import json
-import requests
-import os
 from datetime import datetime
-from assets.lottie_animations import load_lottieurl, load_lottiefile
-import pages.lead_upload as lead_upload
-import pages.ai_coach as ai_coach
-import pages.daily_suggestions as daily_suggestions
-import pages.dashboard as dashboard
+from assets.lottie_animations import prefetch_animations, show_animation
+from utils.coach_jobs import cancel_coach_job, CANCELLED_RESPONSE
+from utils.status_thresholds import DEFAULT_THRESHOLDS, get_status_thresholds
+from utils.page_loader import load_page, get_import_time
+
+# Page modules are imported the first time they are opened. The shell above
+# doesn't import pandas, numpy or pyarrow: the pages load them along with the
+# lead book, which each page initializes itself, so Home renders without them.
+PAGE_MODULES = {
+    "Lead Upload & Scoring": ("pages.lead_upload", "show_lead_upload_page"),
+    "AI Sales Coach": ("pages.ai_coach", "show_ai_coach_page"),
+    "Daily Sales Suggestions": ("pages.daily_suggestions", "show_daily_suggestions_page"),
+    "Performance Dashboard": ("pages.dashboard", "show_dashboard_page"),
+}
 
 # Set page configuration
 st.set_page_config(
@@ -19,13 +29,10 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Initialize session state variables
-if 'leads_df' not in st.session_state:
-    st.session_state.leads_df = pd.DataFrame(columns=[
-        'Name', 'Contact', 'Location', 'Product Interest', 
-        'Last Contact Date', 'Lead Source', 'Score', 'Status'
-    ])
+# Start fetching every page animation in the background (no-op once cached)
+prefetch_animations()
 
+# Initialize session state variables
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 
@@ -35,6 +42,16 @@ if 'total_interactions' not in st.session_state:
 if 'suggestion_clicks' not in st.session_state:
     st.session_state.suggestion_clicks = 0
 
+# Identifies this session's events in the interaction log
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+if 'coach_job' not in st.session_state:
+    st.session_state.coach_job = None
+
+if 'page_timings' not in st.session_state:
+    st.session_state.page_timings = {}
+
 # Custom CSS for styling
 st.markdown("""
 <style>
@@ -75,9 +92,9 @@ st.markdown("""
 # Sidebar menu
 st.sidebar.title("GroMo AI Sales Coach")
 
-# Load and display sidebar logo/animation
-sales_lottie = load_lottieurl('https://assets3.lottiefiles.com/packages/lf20_xbf1be8x.json')
-st_lottie(sales_lottie, speed=1, height=200, key="sidebar_animation")
+# Sidebar logo/animation, filled in once the page is drawn: Streamlit's
+# component layer imports pandas and pyarrow the first time it renders one
+sidebar_animation = st.sidebar.empty()
 
 # Navigation
 page = st.sidebar.radio(
@@ -85,30 +102,54 @@ page = st.sidebar.radio(
     ["Home", "Lead Upload & Scoring", "AI Sales Coach", "Daily Sales Suggestions", "Performance Dashboard"]
 )
 
+# Drop any coach reply still being generated once the user leaves the chat
+if page != "AI Sales Coach" and st.session_state.coach_job is not None:
+    cancel_coach_job(st.session_state.coach_job)
+    st.session_state.coach_job = None
+    # Answer the pending question so it doesn't sit in the history unreplied
+    st.session_state.chat_history.append({"role": "assistant", "content": CANCELLED_RESPONSE})
+
+# Team cutoffs; leads are re-bucketed from their stored scores, never rescored
+with st.sidebar.expander("🎯 Status Thresholds"):
+    st.slider(
+        "Warm from / Hot from",
+        min_value=0,
+        max_value=100,
+        value=DEFAULT_THRESHOLDS,
+        key="status_thresholds",
+        help="Minimum scores for Warm and Hot leads"
+    )
+
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Today's Stats")
-st.sidebar.metric("Leads Uploaded", len(st.session_state.leads_df))
-st.sidebar.metric("Hot Leads", 
-                 len(st.session_state.leads_df[st.session_state.leads_df['Status'] == 'Hot']) if 'Status' in st.session_state.leads_df.columns else 0)
+# No lead book until a page that uses it has been opened
+lead_aggregates = st.session_state.get('lead_aggregates')
+st.sidebar.metric("Leads Uploaded", lead_aggregates.total if lead_aggregates is not None else 0)
+st.sidebar.metric(
+    "Hot Leads",
+    lead_aggregates.status_total('Hot', get_status_thresholds(st.session_state)) if lead_aggregates is not None else 0
+)
 st.sidebar.metric("Coach Interactions", st.session_state.total_interactions)
 
 # Main content area
+shell_time = time.perf_counter() - run_start
+page_start = time.perf_counter()
+
 if page == "Home":
     # Header with animation
     st.markdown('<div class="main-header">Welcome to GroMo AI Sales Coach</div>', unsafe_allow_html=True)
     st.markdown('<div class="subheader">Boost your sales with AI-powered lead scoring & coaching</div>', 
                 unsafe_allow_html=True)
     
-    # Main dashboard animation
-    dashboard_lottie = load_lottieurl('https://assets5.lottiefiles.com/packages/lf20_w4f2qg8o.json')
-    st_lottie(dashboard_lottie, speed=1, height=300, key="dashboard_animation")
+    # Main dashboard animation, filled in below with the sidebar one
+    home_animation = st.empty()
     
     # Quick stats in columns
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.metric("Total Leads", len(st.session_state.leads_df))
+        st.metric("Total Leads", lead_aggregates.total if lead_aggregates is not None else 0)
         st.markdown("Upload and score your leads to improve conversion")
         st.markdown('</div>', unsafe_allow_html=True)
         
@@ -153,14 +194,33 @@ if page == "Home":
             page = "Daily Sales Suggestions"
             st.rerun()
 
-elif page == "Lead Upload & Scoring":
-    lead_upload.show_lead_upload_page()
-    
-elif page == "AI Sales Coach":
-    ai_coach.show_ai_coach_page()
-    
-elif page == "Daily Sales Suggestions":
-    daily_suggestions.show_daily_suggestions_page()
-    
-elif page == "Performance Dashboard":
-    dashboard.show_dashboard_page()
+else:
+    module_name, function_name = PAGE_MODULES[page]
+    show_page = load_page(module_name, function_name)
+    show_page()
+
+# Record load times: the first render in a session approximates first paint
+render_time = time.perf_counter() - page_start
+timings = st.session_state.page_timings.setdefault(page, {
+    'import_ms': get_import_time(PAGE_MODULES[page][0]) * 1000 if page in PAGE_MODULES else 0.0,
+    'first_shell_ms': shell_time * 1000,
+    'first_render_ms': render_time * 1000,
+})
+timings['last_shell_ms'] = shell_time * 1000
+timings['last_render_ms'] = render_time * 1000
+
+with st.sidebar.expander("⏱ Page Load Times"):
+    for timed_page, page_timing in st.session_state.page_timings.items():
+        st.markdown(
+            f"**{timed_page}**  \n"
+            f"Import: {page_timing['import_ms']:.0f} ms  \n"
+            f"App shell: {page_timing['first_shell_ms']:.0f} ms first, {page_timing['last_shell_ms']:.0f} ms last  \n"
+            f"Render: {page_timing['first_render_ms']:.0f} ms first, {page_timing['last_render_ms']:.0f} ms last"
+        )
+
+# Animations last, so the text above is sent before they load
+with sidebar_animation:
+    show_animation('sidebar', key="sidebar_animation", speed=1, height=200)
+if page == "Home":
+    with home_animation:
+        show_animation('sales_dashboard', key="dashboard_animation", speed=1, height=300)
@@ -1,25 +1,153 @@
+import hashlib
 import json
+import os
+import re
+import threading
+import time
 import requests
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from streamlit_lottie import st_lottie
 
-def load_lottieurl(url: str):
+# Network timeouts for fetching animations: (connect, read) in seconds
+REQUEST_TIMEOUT = (3.05, 5)
+
+# Freshness used when the server doesn't send Cache-Control max-age
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# After a failed fetch, serve the stale or fallback copy for this long before retrying
+RETRY_AFTER_SECONDS = 60
+
+# On-disk cache of fetched animations and their validators
+CACHE_DIR = os.environ.get(
+    'LOTTIE_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'gromo-sales-coach', 'lottie')
+)
+
+# Parallel fetches used by the startup prefetcher
+PREFETCH_WORKERS = 6
+
+# How often a placeholder animation checks whether the real one has arrived
+PREFETCH_POLL_SECONDS = 1
+
+# In-process cache: url -> {'animation', 'etag', 'expires_at'}
+_memory_cache = {}
+_memory_lock = threading.Lock()
+
+# Shared keep-alive session so fetches reuse connections to the CDN
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=PREFETCH_WORKERS, pool_maxsize=PREFETCH_WORKERS))
+
+# Background fetches in flight: url -> Future
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="lottie-prefetch")
+_prefetch_futures = {}
+_prefetch_lock = threading.Lock()
+
+def _cache_paths(url):
+    """Paths of the cached animation and its metadata for a URL"""
+    name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f"{name}.json"), os.path.join(CACHE_DIR, f"{name}.meta.json")
+
+def _read_disk_cache(url):
+    """Load a cached animation entry from disk, or None"""
+    data_path, meta_path = _cache_paths(url)
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        with open(data_path, "r") as f:
+            return {'animation': json.load(f), 'etag': meta.get('etag'), 'expires_at': meta.get('expires_at', 0)}
+    except (OSError, ValueError):
+        return None
+
+def _write_disk_cache(url, entry, write_animation=True):
+    """Store an animation entry on disk; failures only cost a refetch later"""
+    data_path, meta_path = _cache_paths(url)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        if write_animation:
+            with open(data_path, "w") as f:
+                json.dump(entry['animation'], f)
+        with open(meta_path, "w") as f:
+            json.dump({'url': url, 'etag': entry['etag'], 'expires_at': entry['expires_at']}, f)
+    except OSError as e:
+        print(f"Error writing Lottie cache: {e}")
+
+def _get_max_age(response):
+    """Read max-age from the response's Cache-Control header"""
+    match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+    return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+def _fetch(url, cached, session=None):
     """
-    Load a Lottie animation from a URL
+    Fetch an animation, revalidating the cached copy if there is one
     
     Args:
         url (str): URL to the Lottie animation JSON
+        cached (dict): Cached entry to revalidate, may be None
+        session (requests.Session, optional): Session to fetch with
         
     Returns:
-        dict: Lottie animation as a JSON object
+        dict: New cache entry
     """
+    headers = {}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    
     try:
-        r = requests.get(url)
-        if r.status_code != 200:
-            return get_fallback_animation()
-        return r.json()
+        r = (session or _session).get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if r.status_code == 304 and cached:
+            entry = dict(cached, expires_at=time.time() + _get_max_age(r))
+            _write_disk_cache(url, entry, write_animation=False)
+            return entry
+        if r.status_code == 200:
+            entry = {'animation': r.json(), 'etag': r.headers.get('ETag'), 'expires_at': time.time() + _get_max_age(r)}
+            _write_disk_cache(url, entry)
+            return entry
+        print(f"Error loading Lottie URL: HTTP {r.status_code} for {url}")
     except Exception as e:
         print(f"Error loading Lottie URL: {e}")
-        return get_fallback_animation()
+    
+    # Serve the stale copy, or the fallback, and hold off retrying for a while
+    animation = cached['animation'] if cached else get_fallback_animation()
+    return {
+        'animation': animation,
+        'etag': cached.get('etag') if cached else None,
+        'expires_at': time.time() + RETRY_AFTER_SECONDS
+    }
+
+def load_lottieurl(url: str, session=None):
+    """
+    Load a Lottie animation from a URL
+    
+    Looks in the in-process cache first, then the on-disk cache, and only
+    goes to the network when neither has a fresh copy. If the network is
+    unavailable, a stale copy or the fallback animation is served instead.
+    
+    Args:
+        url (str): URL to the Lottie animation JSON
+        session (requests.Session, optional): Session to fetch with
+        
+    Returns:
+        dict: Lottie animation as a JSON object
+    """
+    now = time.time()
+    with _memory_lock:
+        cached = _memory_cache.get(url)
+    if cached and cached['expires_at'] > now:
+        return cached['animation']
+    
+    if cached is None:
+        cached = _read_disk_cache(url)
+        if cached and cached['expires_at'] > now:
+            with _memory_lock:
+                _memory_cache[url] = cached
+            return cached['animation']
+    
+    entry = _fetch(url, cached, session)
+    with _memory_lock:
+        _memory_cache[url] = entry
+    return entry['animation']
         
 def get_fallback_animation():
     """
@@ -95,6 +223,7 @@ def load_lottiefile(filepath: str):
 
 # Define a dictionary of commonly used animations
 COMMON_ANIMATIONS = {
+    'sidebar': 'https://assets3.lottiefiles.com/packages/lf20_xbf1be8x.json',
     'sales_dashboard': 'https://assets5.lottiefiles.com/packages/lf20_w4f2qg8o.json',
     'sales_coach': 'https://assets4.lottiefiles.com/private_files/lf30_dln2gqhg.json',
     'product_suggestions': 'https://assets6.lottiefiles.com/packages/lf20_uzvwjpkq.json',
@@ -116,3 +245,72 @@ def get_animation(key):
     if key in COMMON_ANIMATIONS:
         return load_lottieurl(COMMON_ANIMATIONS[key])
     return None
+
+def _submit_prefetch(url):
+    """Start a background fetch for a URL unless one is already running"""
+    with _prefetch_lock:
+        future = _prefetch_futures.get(url)
+        if future is None or future.done():
+            _prefetch_futures[url] = _prefetch_executor.submit(load_lottieurl, url)
+
+def prefetch_animations(urls=None):
+    """
+    Start fetching animations concurrently in the background
+    
+    Args:
+        urls (list, optional): URLs to fetch, defaults to every COMMON_ANIMATIONS entry
+    """
+    for url in (urls or COMMON_ANIMATIONS.values()):
+        with _memory_lock:
+            cached = _memory_cache.get(url)
+        if cached is None or cached['expires_at'] <= time.time():
+            _submit_prefetch(url)
+
+def get_animation_nowait(url):
+    """
+    Get an animation without waiting on the network
+    
+    Args:
+        url (str): URL to the Lottie animation JSON
+        
+    Returns:
+        tuple: (animation, ready) - ready is False while a placeholder is returned
+    """
+    with _memory_lock:
+        cached = _memory_cache.get(url)
+    
+    if cached and cached['expires_at'] > time.time():
+        return cached['animation'], True
+    
+    # Refresh in the background; meanwhile serve the stale copy or a placeholder
+    _submit_prefetch(url)
+    if cached:
+        return cached['animation'], True
+    return get_fallback_animation(), False
+
+def _show_pending_animation(url, key, lottie_kwargs):
+    """Fragment body - show the placeholder until the real animation arrives"""
+    animation, ready = get_animation_nowait(url)
+    if ready:
+        # A full rerun swaps in the real asset and stops this fragment's polling
+        st.rerun()
+    st_lottie(animation, key=key, **lottie_kwargs)
+
+def show_animation(name, key, **lottie_kwargs):
+    """
+    Display a predefined animation without blocking the page
+    
+    If the animation hasn't been fetched yet, the fallback is shown and
+    replaced as soon as the background fetch completes.
+    
+    Args:
+        name (str): Key of the animation in COMMON_ANIMATIONS
+        key (str): Streamlit element key
+        **lottie_kwargs: Extra arguments for st_lottie (speed, height, ...)
+    """
+    url = COMMON_ANIMATIONS[name]
+    animation, ready = get_animation_nowait(url)
+    if ready:
+        st_lottie(animation, key=key, **lottie_kwargs)
+    else:
+        st.fragment(_show_pending_animation, run_every=PREFETCH_POLL_SECONDS)(url, key, lottie_kwargs)
@@ -1,65 +1,113 @@
 import streamlit as st
-from streamlit_lottie import st_lottie
+import pandas as pd
 import time
-from utils.ai_coach import generate_ai_response, get_sales_tip_of_the_day
-from assets.lottie_animations import load_lottieurl, load_lottiefile
+from streamlit.errors import StreamlitAPIException
+from utils.ai_coach import get_sales_tip_of_the_day
+from utils.coach_jobs import submit_coach_job, get_busy_response, JOB_TIMEOUT_SECONDS
+from utils.batch_pitches import generate_batch_pitches
+from utils.lead_book import init_lead_book, get_leads
+from utils.lead_scoring import apply_status_thresholds
+from utils.status_thresholds import get_status_thresholds
+from utils.event_log import log_event, COACH_QUERY
+from assets.lottie_animations import show_animation
 
-def show_ai_coach_page():
-    """Display the AI sales coach chat page"""
-    st.title("AI Sales Coach")
-    st.markdown("Get personalized sales advice and coaching")
+# Questions offered as one-click prompts next to the chat
+COMMON_QUESTIONS = [
+    "How do I close a hesitant lead?",
+    "What's the best way to handle price objections?",
+    "How to create an effective sales pitch?",
+    "Tips for cross-selling insurance products?",
+    "How to build rapport quickly?",
+    "Best follow-up strategies for cold leads?"
+]
+
+# How often the typing indicator checks for a finished reply
+REPLY_POLL_SECONDS = 0.25
+
+# How often the batch pitch table is redrawn while pitches stream in
+PITCH_REFRESH_SECONDS = 0.5
+
+def add_coach_reply(ai_response, duration=None):
+    """
+    Add the coach's reply to the chat history
+    
+    Args:
+        ai_response (str): AI response
+        duration (float, optional): Seconds the reply took to generate
+    """
+    st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
+    
+    # Increment interaction counter
+    st.session_state.total_interactions += 1
+    log_event(COACH_QUERY, st.session_state.session_id, duration=duration)
+
+def send_chat_message(user_input):
+    """
+    Add a user message to the chat history and queue the coach's reply
+    
+    Args:
+        user_input (str): User's question or prompt
+    """
+    st.session_state.chat_history.append({"role": "user", "content": user_input})
+    
+    # Generate the AI response in the shared worker pool
+    job = submit_coach_job(user_input, st.session_state.chat_history)
+    if job is None:
+        # Queue is full - answer right away instead of making the user wait
+        add_coach_reply(get_busy_response())
+    else:
+        st.session_state.coach_job = job
+
+def wait_for_coach_reply(placeholder):
+    """
+    Show a typing indicator until the pending coach job finishes
+    
+    Each poll redraws the placeholder, which lets Streamlit interrupt the
+    wait as soon as the user interacts with the page. Once the reply is in,
+    only the chat fragment is rerun to show it.
+    
+    Args:
+        placeholder: Empty container to draw the typing indicator into
+    """
+    job = st.session_state.coach_job
+    ticks = 0
     
-    # Display tips of the day
-    st.info(f"💡 **Tip of the day:** {get_sales_tip_of_the_day()}")
+    while not job.wait(REPLY_POLL_SECONDS):
+        if job.elapsed() > JOB_TIMEOUT_SECONDS:
+            job.cancel()
+            break
+        ticks += 1
+        placeholder.markdown(f"*AI Coach is typing{'.' * (ticks % 3 + 1)}*")
     
-    # Two-column layout
+    st.session_state.coach_job = None
+    add_coach_reply(job.result(), duration=job.elapsed())
+    
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        # Not a fragment run (e.g. the page was fully rerun mid-reply)
+        st.rerun()
+
+def submit_chat_form():
+    """Form callback that sends the typed question to the coach"""
+    user_input = st.session_state.user_query
+    if user_input:
+        send_chat_message(user_input)
+
+@st.fragment
+def show_chat_panel():
+    """
+    Display the chat history, input form and common questions
+    
+    Runs as a fragment: sending a message only reruns this panel instead of
+    the whole app (sidebar, CSS, animations and page dispatch).
+    """
+    reply_pending = st.session_state.coach_job is not None
     col1, col2 = st.columns([3, 2])
     
     with col1:
-        # Chat container with styling
-        st.markdown("""
-        <style>
-        .chat-container {
-            background-color: #f9f9f9;
-            border-radius: 10px;
-            padding: 20px;
-            height: 400px;
-            overflow-y: auto;
-        }
-        .user-message {
-            background-color: #e1f5fe;
-            border-radius: 18px 18px 0 18px;
-            padding: 10px 15px;
-            margin: 5px 0;
-            max-width: 80%;
-            margin-left: auto;
-            margin-right: 10px;
-        }
-        .bot-message {
-            background-color: #f0f0f0;
-            border-radius: 18px 18px 18px 0;
-            padding: 10px 15px;
-            margin: 5px 0;
-            max-width: 80%;
-            margin-right: auto;
-            margin-left: 10px;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
         st.markdown('<div class="chat-container">', unsafe_allow_html=True)
         
-        # Initialize chat history if not exists
-        if 'chat_history' not in st.session_state:
-            st.session_state.chat_history = []
-            
-            # Add a welcome message if chat is empty
-            welcome_message = {
-                "role": "assistant", 
-                "content": "Hi there! I'm your AI Sales Coach. Ask me any questions about sales techniques, handling objections, or product pitches. What would you like help with today?"
-            }
-            st.session_state.chat_history.append(welcome_message)
-        
         # Display chat messages
         for message in st.session_state.chat_history:
             if message["role"] == "user":
@@ -67,65 +115,125 @@ def show_ai_coach_page():
             else:
                 st.markdown(f'<div class="bot-message">🤖 {message["content"]}</div>', unsafe_allow_html=True)
         
+        reply_placeholder = st.empty()
+        
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Chat input
         with st.form("chat_form", clear_on_submit=True):
-            user_input = st.text_input("Ask me anything about sales:", key="user_query")
-            submitted = st.form_submit_button("Send")
-            
-            if submitted and user_input:
-                # Add user message to chat
-                st.session_state.chat_history.append({"role": "user", "content": user_input})
-                
-                # Update chat history display
-                st.rerun()
-                
-    # Handle AI response (outside the form to avoid rerun issues)
-    if st.session_state.chat_history and st.session_state.chat_history[-1]["role"] == "user":
-        user_query = st.session_state.chat_history[-1]["content"]
-        
-        # Show a typing indicator
-        with col1:
-            typing_placeholder = st.empty()
-            typing_placeholder.markdown("*AI Coach is typing...*")
-            
-            # Generate AI response
-            ai_response = generate_ai_response(user_query, st.session_state.chat_history)
-            
-            # Simulate typing delay for better user experience
-            time.sleep(1)
-            typing_placeholder.empty()
-            
-            # Add AI response to chat
-            st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
-            
-            # Increment interaction counter
-            st.session_state.total_interactions += 1
-            
-            # Update display
-            st.rerun()
+            st.text_input("Ask me anything about sales:", key="user_query")
+            st.form_submit_button("Send", on_click=submit_chat_form, disabled=reply_pending)
     
     with col2:
-        # Display a coaching animation
-        coach_lottie = load_lottieurl('https://assets4.lottiefiles.com/private_files/lf30_dln2gqhg.json')
-        st_lottie(coach_lottie, key="coach_animation", height=300)
-        
         # Common sales questions
         st.subheader("Common Sales Questions")
         
-        common_questions = [
-            "How do I close a hesitant lead?",
-            "What's the best way to handle price objections?",
-            "How to create an effective sales pitch?",
-            "Tips for cross-selling insurance products?",
-            "How to build rapport quickly?",
-            "Best follow-up strategies for cold leads?"
-        ]
+        for question in COMMON_QUESTIONS:
+            st.button(question, key=f"q_{question[:10]}", on_click=send_chat_message, args=(question,),
+                      disabled=reply_pending)
+    
+    # Wait for the reply last, so the rest of the panel is already drawn
+    if reply_pending:
+        wait_for_coach_reply(reply_placeholder)
+
+@st.fragment
+def show_batch_pitch_panel():
+    """Generate openers for all Hot and Warm leads and offer them as a download"""
+    st.markdown("Create a personalized opening line for every Hot and Warm lead in one go.")
+    
+    if st.button("Generate Pitches", key="generate_pitches"):
+        progress_bar = st.progress(0.0, text="Generating pitches...")
+        table_placeholder = st.empty()
+        chunks = []
+        last_refresh = 0.0
+        
+        for done, total, chunk in generate_batch_pitches(
+            apply_status_thresholds(get_leads(st.session_state), get_status_thresholds(st.session_state))
+        ):
+            chunks.append(chunk)
+            progress_bar.progress(done / total, text=f"Generated {done} of {total} pitches")
+            
+            # Redraw the partial table at a fixed rate rather than per chunk
+            if time.monotonic() - last_refresh > PITCH_REFRESH_SECONDS:
+                table_placeholder.dataframe(pd.concat(chunks), use_container_width=True)
+                last_refresh = time.monotonic()
+        
+        progress_bar.empty()
+        table_placeholder.empty()
+        st.session_state.batch_pitches = pd.concat(chunks).sort_values('Score', ascending=False) if chunks else None
+        if not chunks:
+            st.info("No Hot or Warm leads yet. Upload and score leads to generate pitches.")
+    
+    pitches = st.session_state.get('batch_pitches')
+    if pitches is not None:
+        st.dataframe(pitches, use_container_width=True)
+        st.download_button(
+            label="Download Pitches CSV",
+            data=pitches.to_csv(index=False),
+            file_name="lead_pitches.csv",
+            mime="text/csv",
+        )
+
+def show_ai_coach_page():
+    """Display the AI sales coach chat page"""
+    init_lead_book(st.session_state)
+    header_col, animation_col = st.columns([3, 2])
+    
+    with header_col:
+        st.title("AI Sales Coach")
+        st.markdown("Get personalized sales advice and coaching")
         
-        for question in common_questions:
-            if st.button(question, key=f"q_{question[:10]}"):
-                # Add question to chat
-                st.session_state.chat_history.append({"role": "user", "content": question})
-                # Rerun to trigger the AI response
-                st.rerun()
+        # Display tips of the day
+        st.info(f"💡 **Tip of the day:** {get_sales_tip_of_the_day()}")
+    
+    with animation_col:
+        # Display a coaching animation
+        show_animation('sales_coach', key="coach_animation", height=200)
+    
+    # Chat container with styling
+    st.markdown("""
+    <style>
+    .chat-container {
+        background-color: #f9f9f9;
+        border-radius: 10px;
+        padding: 20px;
+        height: 400px;
+        overflow-y: auto;
+    }
+    .user-message {
+        background-color: #e1f5fe;
+        border-radius: 18px 18px 0 18px;
+        padding: 10px 15px;
+        margin: 5px 0;
+        max-width: 80%;
+        margin-left: auto;
+        margin-right: 10px;
+    }
+    .bot-message {
+        background-color: #f0f0f0;
+        border-radius: 18px 18px 18px 0;
+        padding: 10px 15px;
+        margin: 5px 0;
+        max-width: 80%;
+        margin-right: auto;
+        margin-left: 10px;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+    
+    # Initialize chat history if not exists
+    if 'chat_history' not in st.session_state:
+        st.session_state.chat_history = []
+        
+        # Add a welcome message if chat is empty
+        welcome_message = {
+            "role": "assistant", 
+            "content": "Hi there! I'm your AI Sales Coach. Ask me any questions about sales techniques, handling objections, or product pitches. What would you like help with today?"
+        }
+        st.session_state.chat_history.append(welcome_message)
+    
+    show_chat_panel()
+    
+    # Batch pitches for the whole lead book
+    with st.expander("⚡ Batch Pitches for Hot & Warm Leads"):
+        show_batch_pitch_panel()
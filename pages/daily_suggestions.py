@@ -1,21 +1,28 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from streamlit_lottie import st_lottie
-from utils.daily_suggestions import get_daily_suggestions
-from assets.lottie_animations import load_lottieurl, load_lottiefile
+from utils.daily_suggestions import get_daily_suggestions, get_ranked_suggestions, get_suggestion_calendar
+from utils.call_lists import get_call_lists
+from utils.event_log import log_event, SUGGESTION_CLICK
+from utils.lead_book import init_lead_book
+from assets.lottie_animations import show_animation
 
 def show_daily_suggestions_page():
     """Display the daily sales suggestions page"""
+    init_lead_book(st.session_state)
     st.title("Daily Sales Suggestions")
     st.markdown(f"Personalized product recommendations for {datetime.now().strftime('%A, %B %d, %Y')}")
     
-    # Get suggestions
-    suggestions = get_daily_suggestions()
+    # Get suggestions, optionally ranked by demand in the user's own leads
+    rank_by_leads = st.toggle(
+        "Rank by my leads",
+        value=st.session_state.lead_aggregates.total > 0,
+        help="Order today's products by how many hot and warm leads are interested in them"
+    )
+    suggestions = get_ranked_suggestions(st.session_state) if rank_by_leads else get_daily_suggestions()
     
     # Animation at the top
-    suggestion_lottie = load_lottieurl('https://assets6.lottiefiles.com/packages/lf20_uzvwjpkq.json')
-    st_lottie(suggestion_lottie, speed=1, height=200, key="suggestion_animation")
+    show_animation('product_suggestions', key="suggestion_animation", speed=1, height=200)
     
     # Introduction text
     st.markdown("""
@@ -65,8 +72,9 @@ def show_daily_suggestions_page():
     col1, col2 = st.columns(2)
     
     # Function to increment suggestion clicks
-    def increment_suggestion_clicks():
+    def increment_suggestion_clicks(product):
         st.session_state.suggestion_clicks += 1
+        log_event(SUGGESTION_CLICK, st.session_state.session_id, name=product)
     
     # Display suggestions in cards
     for i, suggestion in enumerate(suggestions):
@@ -89,11 +97,58 @@ def show_daily_suggestions_page():
                 st.markdown("</div>", unsafe_allow_html=True)
                 
                 # Action button
-                if st.button(f"Use This Suggestion", key=f"suggestion_{i}", on_click=increment_suggestion_clicks):
+                if st.button(f"Use This Suggestion", key=f"suggestion_{i}", on_click=increment_suggestion_clicks, args=(suggestion['product'],)):
                     st.success(f"Added '{suggestion['product']}' to your focus list for today!")
                 
                 st.markdown("</div>", unsafe_allow_html=True)
     
+    # Today's products joined to the user's own Hot and Warm leads
+    st.markdown("---")
+    st.subheader("📞 Today's Call Lists")
+    if st.session_state.lead_aggregates.total == 0:
+        st.info("Upload leads on the Lead Upload & Scoring page to get a call list for each of today's products.")
+    else:
+        call_lists = get_call_lists(st.session_state, suggestions)
+        for suggestion, leads in call_lists:
+            with st.expander(f"**{suggestion['product']}** - {len(leads)} leads to call"):
+                if leads.empty:
+                    st.caption("No hot or warm leads are interested in this product.")
+                else:
+                    st.dataframe(leads, hide_index=True, key=f"call_list_{suggestion['product']}")
+
+        call_list_df = pd.concat(
+            [leads.assign(Product=suggestion['product']) for suggestion, leads in call_lists if not leads.empty]
+            or [pd.DataFrame(columns=['Product'])],
+            ignore_index=True
+        )
+        st.download_button(
+            label="Download Today's Call Lists",
+            data=call_list_df.to_csv(index=False),
+            file_name=f"call_lists_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv",
+            key="download_call_lists",
+        )
+
+    # Planning export for the coming month
+    plan_df = pd.DataFrame([
+        {
+            "Date": day.strftime('%Y-%m-%d'),
+            "Day": day.strftime('%A'),
+            "Priority": rank + 1,
+            "Product": suggestion['product'],
+            "Reason": suggestion['reason'],
+            "Approach": suggestion['approach']
+        }
+        for day, day_suggestions in get_suggestion_calendar(days=30)
+        for rank, suggestion in enumerate(day_suggestions)
+    ])
+    st.download_button(
+        label="Download 30-Day Plan",
+        data=plan_df.to_csv(index=False),
+        file_name="sales_plan_30_days.csv",
+        mime="text/csv",
+    )
+    
     # Additional resources section
     st.markdown("---")
     st.subheader("Resources & Materials")
@@ -1,20 +1,264 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import time
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from streamlit_lottie import st_lottie
-from assets.lottie_animations import load_lottieurl, load_lottiefile
+from assets.lottie_animations import show_animation
+from utils.dashboard_data import get_dashboard_data
+from utils.event_log import get_event_rollup, get_event_count, COACH_QUERY, SUGGESTION_CLICK, LEAD_UPLOAD
+from utils.lead_book import init_lead_book, get_leads
+from utils.lead_scoring import DEFAULT_SCORING_RULES, compare_scoring_rules
+from utils.lead_bitmaps import FILTER_COLUMNS, get_filter_options
+
+# Display names for logged interaction events
+EVENT_LABELS = {
+    COACH_QUERY: 'Coach Queries',
+    SUGGESTION_CLICK: 'Suggestions Used',
+    LEAD_UPLOAD: 'Lead Uploads',
+}
+
+# Lead Source keywords scored as cold sources
+COLD_SOURCES = ['cold call', 'exhibition', 'advertisement']
+
+# Current weights as one row of the what-if editor
+BASELINE_VARIANT = {
+    'Variant': 'Current',
+    'Referral': DEFAULT_SCORING_RULES['sources']['referral'],
+    'Website': DEFAULT_SCORING_RULES['sources']['website'],
+    'Partner': DEFAULT_SCORING_RULES['sources']['partner'],
+    'Existing Customer': DEFAULT_SCORING_RULES['sources']['existing customer'],
+    'Cold Sources': DEFAULT_SCORING_RULES['sources']['cold call'],
+    'Premium Products': DEFAULT_SCORING_RULES['products']['insurance'],
+    'Last 7 Days': DEFAULT_SCORING_RULES['recency'][0]['points'],
+    'Last 30 Days': DEFAULT_SCORING_RULES['recency'][1]['points'],
+    'Stale After (days)': DEFAULT_SCORING_RULES['recency'][2]['min_days'] - 1,
+    'Stale Points': DEFAULT_SCORING_RULES['recency'][2]['points'],
+    'Warm From': DEFAULT_SCORING_RULES['warm_threshold'],
+    'Hot From': DEFAULT_SCORING_RULES['hot_threshold'],
+}
+
+def get_default_variants():
+    """Starting rows for the what-if editor: the current weights and two alternatives"""
+    return pd.DataFrame([
+        BASELINE_VARIANT,
+        {**BASELINE_VARIANT, 'Variant': 'Referral +20', 'Referral': 20},
+        {**BASELINE_VARIANT, 'Variant': 'Stale after 60 days', 'Stale After (days)': 60},
+    ])
+
+def get_variant_rules(row):
+    """
+    Turn one row of the what-if editor into scoring rules
+    
+    Args:
+        row (dict): Editor row; blank cells fall back to the current weights
+        
+    Returns:
+        dict: Rule set for compare_scoring_rules
+    """
+    row = {**BASELINE_VARIANT, **{col: value for col, value in row.items() if pd.notna(value)}}
+    return {
+        'sources': {
+            'referral': row['Referral'],
+            'website': row['Website'],
+            'partner': row['Partner'],
+            'existing customer': row['Existing Customer'],
+            **{source: row['Cold Sources'] for source in COLD_SOURCES},
+        },
+        'products': {product: row['Premium Products'] for product in DEFAULT_SCORING_RULES['products']},
+        'recency': [
+            {'min_days': None, 'max_days': 7, 'points': row['Last 7 Days']},
+            {'min_days': 8, 'max_days': 30, 'points': row['Last 30 Days']},
+            {'min_days': int(row['Stale After (days)']) + 1, 'max_days': None, 'points': row['Stale Points']},
+        ],
+        'warm_threshold': row['Warm From'],
+        'hot_threshold': row['Hot From'],
+    }
+
+@st.fragment
+def show_what_if_panel():
+    """Compare alternative scoring weights across the whole lead book"""
+    st.markdown("Edit or add scoring variants, then compare how many leads would be Hot, Warm and Cold under each. The first row is the baseline.")
+    
+    variants_df = st.data_editor(get_default_variants(), num_rows="dynamic", hide_index=True, key="what_if_variants")
+    
+    if st.button("Compare Variants", key="compare_variants"):
+        variants = {}
+        for i, row in enumerate(variants_df.to_dict('records')):
+            name = row.get('Variant') if pd.notna(row.get('Variant')) else f"Variant {i + 1}"
+            variants[name] = get_variant_rules(row)
+        
+        start = time.perf_counter()
+        comparison = compare_scoring_rules(get_leads(st.session_state), variants)
+        st.session_state.what_if_comparison = {
+            'comparison': comparison,
+            'seconds': time.perf_counter() - start,
+            'version': st.session_state.leads_version,
+        }
+    
+    result = st.session_state.get('what_if_comparison')
+    if result is not None:
+        st.dataframe(result['comparison'], use_container_width=True)
+        st.caption(f"Scored {len(result['comparison'])} variants in {result['seconds'] * 1000:.0f} ms")
+        if result['version'] != st.session_state.leads_version:
+            st.caption("Your leads have changed since this comparison was run.")
+
+def build_status_figure(status_counts):
+    """Pie chart of leads by status"""
+    # Create color map
+    color_map = {'Hot': '#4CAF50', 'Warm': '#FFC107', 'Cold': '#f44336'}
+    
+    # Create pie chart
+    fig = px.pie(
+        status_counts, 
+        values='Count', 
+        names='Status',
+        title='Lead Distribution by Status',
+        color='Status',
+        color_discrete_map=color_map,
+        hole=0.4
+    )
+    
+    # Update layout
+    fig.update_layout(
+        legend_title_text='Lead Status',
+        legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5)
+    )
+    return fig
+
+def build_source_figure(source_counts):
+    """Bar chart of leads by source"""
+    fig = px.bar(
+        source_counts, 
+        x='Lead Source', 
+        y='Count',
+        title='Lead Count by Source',
+        color='Count',
+        color_continuous_scale=['#2196F3', '#4CAF50']
+    )
+    
+    # Update layout
+    fig.update_layout(
+        xaxis_title='Lead Source',
+        yaxis_title='Number of Leads',
+    )
+    return fig
+
+def build_product_figure(product_counts):
+    """Horizontal bar chart of leads by product interest"""
+    fig = px.bar(
+        product_counts, 
+        y='Product Interest', 
+        x='Count',
+        title='Interest by Product',
+        orientation='h',
+        color='Count',
+        color_continuous_scale=['#2196F3', '#4CAF50']
+    )
+    
+    # Update layout
+    fig.update_layout(
+        yaxis_title='Product',
+        xaxis_title='Number of Leads',
+    )
+    return fig
+
+def build_score_figure(score_chart):
+    """Histogram of lead scores with the status thresholds marked"""
+    score_bins, (warm_threshold, hot_threshold) = score_chart
+    
+    # Bins are counted on the server, so only one bar per bin is sent to the browser
+    fig = go.Figure(go.Bar(
+        x=score_bins['Bin Start'] + (score_bins['Bin End'] - score_bins['Bin Start']) / 2,
+        y=score_bins['Count'],
+        width=(score_bins['Bin End'] - score_bins['Bin Start']) * 0.9,
+        customdata=score_bins[['Bin Start', 'Bin End']],
+        hovertemplate='Score %{customdata[0]}-%{customdata[1]}<br>Leads: %{y}<extra></extra>',
+        marker_color='#2196F3'
+    ))
+    
+    # Add vertical lines for score categories
+    fig.add_vline(x=warm_threshold, line_dash="dash", line_color="#FFC107", annotation_text="Warm Threshold")
+    fig.add_vline(x=hot_threshold, line_dash="dash", line_color="#4CAF50", annotation_text="Hot Threshold")
+    
+    # Update layout
+    fig.update_layout(
+        title='Distribution of Lead Scores',
+        xaxis_title='Lead Score',
+        yaxis_title='Number of Leads',
+        xaxis_range=[0, 100]
+    )
+    return fig
+
+def build_location_figure(location_counts):
+    """Bar chart of the top 10 locations"""
+    fig = px.bar(
+        location_counts.head(10), 
+        x='Location', 
+        y='Count',
+        title='Top 10 Locations by Lead Count',
+        color='Count',
+        color_continuous_scale=['#2196F3', '#4CAF50']
+    )
+    
+    # Update layout
+    fig.update_layout(
+        xaxis_title='Location',
+        yaxis_title='Number of Leads',
+    )
+    return fig
+
+# Chart name -> (data needed, figure builder)
+FIGURE_BUILDERS = {
+    'status': (lambda data: data['counts'].get('Status'), build_status_figure),
+    'source': (lambda data: data['counts'].get('Lead Source'), build_source_figure),
+    'product': (lambda data: data['counts'].get('Product Interest'), build_product_figure),
+    'score': (lambda data: (data['score_bins'], data['thresholds']) if data['score_bins'] is not None else None, build_score_figure),
+    'location': (lambda data: data['counts'].get('Location'), build_location_figure),
+}
+
+def get_dashboard_figures(data):
+    """
+    Get the dashboard charts, rebuilding them only when the dashboard data changes
+    
+    Args:
+        data (dict): Dashboard aggregates from get_dashboard_data, which are
+            rebuilt whenever the lead book, thresholds or filters change
+    
+    Returns:
+        dict: Chart name -> Plotly figure, or None when there is no data for it
+    """
+    cache = st.session_state.get('dashboard_figures')
+    if cache is None or cache['data'] is not data:
+        figures = {}
+        for name, (select_data, build_figure) in FIGURE_BUILDERS.items():
+            chart_data = select_data(data) if data['total'] else None
+            figures[name] = build_figure(chart_data) if chart_data is not None else None
+        cache = {'data': data, 'figures': figures}
+        st.session_state.dashboard_figures = cache
+    return cache['figures']
 
 def show_dashboard_page():
     """Display the performance dashboard page"""
+    init_lead_book(st.session_state)
     st.title("Performance Dashboard")
     st.markdown("Track your sales performance metrics and lead statistics")
     
     # Dashboard animation
-    dashboard_lottie = load_lottieurl('https://assets9.lottiefiles.com/packages/lf20_tllkbdio.json')
-    st_lottie(dashboard_lottie, speed=1, height=200, key="dashboard_animation")
+    show_animation('performance', key="dashboard_animation", speed=1, height=200)
+    
+    # Slice the whole dashboard; answered from the bitmap indexes
+    with st.expander("🔎 Filter Leads"):
+        options = get_filter_options(st.session_state)
+        filter_cols = st.columns(len(FILTER_COLUMNS))
+        filters = {
+            col: filter_col.multiselect(col, options[col], key=f"dashboard_filter_{col}")
+            for filter_col, col in zip(filter_cols, FILTER_COLUMNS)
+        }
+    
+    data = get_dashboard_data(st.session_state, filters)
+    figures = get_dashboard_figures(data)
     
     # Key metrics in expandable card
     with st.expander("📊 Key Metrics", expanded=True):
@@ -25,14 +269,15 @@ def show_dashboard_page():
             # Total leads
             st.metric(
                 "Total Leads", 
-                len(st.session_state.leads_df),
+                data['total'],
                 delta=None
             )
             
         with col2:
             # Hot leads percentage
-            hot_leads = len(st.session_state.leads_df[st.session_state.leads_df['Status'] == 'Hot']) if not st.session_state.leads_df.empty and 'Status' in st.session_state.leads_df.columns else 0
-            hot_percentage = round((hot_leads / len(st.session_state.leads_df) * 100) if len(st.session_state.leads_df) > 0 else 0, 1)
+            status_counts = data['counts'].get('Status')
+            hot_leads = int(status_counts.loc[status_counts['Status'] == 'Hot', 'Count'].sum()) if status_counts is not None else 0
+            hot_percentage = round((hot_leads / data['total'] * 100) if data['total'] > 0 else 0, 1)
             
             st.metric(
                 "Hot Leads %",
@@ -41,49 +286,46 @@ def show_dashboard_page():
             )
             
         with col3:
-            # AI Coach interactions
+            # AI Coach interactions across all reps today
             st.metric(
                 "Coach Interactions",
-                st.session_state.total_interactions,
-                delta=None
+                get_event_count(COACH_QUERY),
+                delta=None,
+                help="All reps, today"
             )
             
         with col4:
-            # Suggestion clicks
+            # Suggestion clicks across all reps today
             st.metric(
                 "Suggestions Utilized",
-                st.session_state.suggestion_clicks,
-                delta=None
+                get_event_count(SUGGESTION_CLICK),
+                delta=None,
+                help="All reps, today"
+            )
+    
+    # Interaction history from the event log
+    with st.expander("🗂 Team Activity (Last 7 Days)"):
+        rollup = get_event_rollup(days=7)
+        if rollup.empty:
+            st.info("No coach queries, suggestion clicks or uploads logged yet")
+        else:
+            st.dataframe(
+                rollup.assign(Event=rollup['Event'].map(EVENT_LABELS).fillna(rollup['Event'])),
+                hide_index=True,
+                use_container_width=True
             )
     
+    # Scoring what-if comparison
+    with st.expander("🧪 What-If Scoring"):
+        if data['total']:
+            show_what_if_panel()
+        else:
+            st.info("Upload leads to compare scoring variants")
+    
     # Lead distribution chart
     with st.expander("🔥 Lead Status Distribution", expanded=True):
-        if not st.session_state.leads_df.empty and 'Status' in st.session_state.leads_df.columns:
-            # Count leads by status
-            status_counts = st.session_state.leads_df['Status'].value_counts().reset_index()
-            status_counts.columns = ['Status', 'Count']
-            
-            # Create color map
-            color_map = {'Hot': '#4CAF50', 'Warm': '#FFC107', 'Cold': '#f44336'}
-            
-            # Create pie chart
-            fig = px.pie(
-                status_counts, 
-                values='Count', 
-                names='Status',
-                title='Lead Distribution by Status',
-                color='Status',
-                color_discrete_map=color_map,
-                hole=0.4
-            )
-            
-            # Update layout
-            fig.update_layout(
-                legend_title_text='Lead Status',
-                legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5)
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        if figures['status'] is not None:
+            st.plotly_chart(figures['status'], use_container_width=True)
         else:
             st.info("Upload leads to see distribution chart")
     
@@ -92,113 +334,29 @@ def show_dashboard_page():
     
     with col1:
         with st.expander("📋 Lead Sources", expanded=True):
-            if not st.session_state.leads_df.empty and 'Lead Source' in st.session_state.leads_df.columns:
-                # Count leads by source
-                source_counts = st.session_state.leads_df['Lead Source'].value_counts().reset_index()
-                source_counts.columns = ['Lead Source', 'Count']
-                
-                # Create bar chart
-                fig = px.bar(
-                    source_counts, 
-                    x='Lead Source', 
-                    y='Count',
-                    title='Lead Count by Source',
-                    color='Count',
-                    color_continuous_scale=['#2196F3', '#4CAF50']
-                )
-                
-                # Update layout
-                fig.update_layout(
-                    xaxis_title='Lead Source',
-                    yaxis_title='Number of Leads',
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
+            if figures['source'] is not None:
+                st.plotly_chart(figures['source'], use_container_width=True)
             else:
                 st.info("Upload leads to see sources analysis")
     
     with col2:
         with st.expander("🔍 Product Interest", expanded=True):
-            if not st.session_state.leads_df.empty and 'Product Interest' in st.session_state.leads_df.columns:
-                # Count leads by product interest
-                product_counts = st.session_state.leads_df['Product Interest'].value_counts().reset_index()
-                product_counts.columns = ['Product Interest', 'Count']
-                
-                # Create horizontal bar chart
-                fig = px.bar(
-                    product_counts, 
-                    y='Product Interest', 
-                    x='Count',
-                    title='Interest by Product',
-                    orientation='h',
-                    color='Count',
-                    color_continuous_scale=['#2196F3', '#4CAF50']
-                )
-                
-                # Update layout
-                fig.update_layout(
-                    yaxis_title='Product',
-                    xaxis_title='Number of Leads',
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
+            if figures['product'] is not None:
+                st.plotly_chart(figures['product'], use_container_width=True)
             else:
                 st.info("Upload leads to see product interest analysis")
     
     # Lead scoring distribution
     with st.expander("📈 Lead Score Distribution", expanded=True):
-        if not st.session_state.leads_df.empty and 'Score' in st.session_state.leads_df.columns:
-            # Create histogram
-            fig = px.histogram(
-                st.session_state.leads_df, 
-                x='Score',
-                nbins=20,
-                title='Distribution of Lead Scores',
-                color_discrete_sequence=['#2196F3']
-            )
-            
-            # Add vertical lines for score categories
-            fig.add_vline(x=50, line_dash="dash", line_color="#FFC107", annotation_text="Warm Threshold")
-            fig.add_vline(x=80, line_dash="dash", line_color="#4CAF50", annotation_text="Hot Threshold")
-            
-            # Update layout
-            fig.update_layout(
-                xaxis_title='Lead Score',
-                yaxis_title='Number of Leads',
-                bargap=0.1
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        if figures['score'] is not None:
+            st.plotly_chart(figures['score'], use_container_width=True)
         else:
             st.info("Upload leads to see score distribution")
     
     # Location analysis
     with st.expander("🌎 Geographic Distribution", expanded=True):
-        if not st.session_state.leads_df.empty and 'Location' in st.session_state.leads_df.columns:
-            # Count leads by location
-            location_counts = st.session_state.leads_df['Location'].value_counts().reset_index()
-            location_counts.columns = ['Location', 'Count']
-            
-            # Sort by count
-            location_counts = location_counts.sort_values('Count', ascending=False)
-            
-            # Create bar chart
-            fig = px.bar(
-                location_counts.head(10), 
-                x='Location', 
-                y='Count',
-                title='Top 10 Locations by Lead Count',
-                color='Count',
-                color_continuous_scale=['#2196F3', '#4CAF50']
-            )
-            
-            # Update layout
-            fig.update_layout(
-                xaxis_title='Location',
-                yaxis_title='Number of Leads',
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        if figures['location'] is not None:
+            st.plotly_chart(figures['location'], use_container_width=True)
         else:
             st.info("Upload leads to see geographic distribution")
     
@@ -1,11 +1,182 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import math
 from datetime import datetime
-from utils.lead_scoring import score_leads, validate_lead_data, preprocess_lead_data
+from utils.lead_scoring import score_leads, apply_status_thresholds
+from utils.lead_book import init_lead_book, get_leads, append_leads, remove_leads, rescore_leads
+from utils.lead_batch import load_lead_batch
+from utils.lead_search import search_leads
+from utils.lead_bitmaps import FILTER_COLUMNS, get_filter_options, filter_leads
+from utils.locations import normalize_locations
+from utils.lead_table import query_leads, get_page, status_styles
+from utils.status_thresholds import get_status_thresholds
+from utils.lead_aggregates import score_histogram, count_status
+from utils.lead_export import EXPORT_FORMATS, export_leads
+from utils.event_log import log_event, LEAD_UPLOAD
+
+# Page sizes offered for the lead tables
+PAGE_SIZES = [25, 50, 100, 500]
+
+def show_leads_table(df, key, version, selectable=False, indexed=False):
+    """
+    Display leads one page at a time with server-side search, filter, sort and styling
+    
+    Only the visible page is styled and sent to the browser.
+    
+    Args:
+        df (pd.DataFrame): Leads to display
+        key (str): Unique key prefix for the table's widgets
+        version: Changes whenever df changes, used to cache the row order
+        selectable (bool): Allow selecting rows
+        indexed (bool): Offer search and multi-column filters answered from the
+            book's indexes; df must be the session's lead book
+        
+    Returns:
+        pd.DataFrame: Leads on the visible page
+    """
+    search = ""
+    filters = {}
+    if indexed:
+        search = st.text_input(
+            "Search",
+            key=f"{key}_search",
+            placeholder="Name, contact or city",
+            help="Finds leads containing every word; words under 3 characters match the start of a word"
+        ).strip()
+        
+        options = get_filter_options(st.session_state)
+        filter_cols = st.columns(len(FILTER_COLUMNS))
+        filters = {
+            col: filter_col.multiselect(col, options[col], key=f"{key}_filter_{col}")
+            for filter_col, col in zip(filter_cols, FILTER_COLUMNS)
+        }
+        statuses = []
+        col2, col3, col4 = st.columns([2, 2, 1])
+    else:
+        col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+        statuses = col1.multiselect("Status", ["Hot", "Warm", "Cold"], key=f"{key}_statuses")
+    sort_by = col2.selectbox("Sort by", ["Original order"] + list(df.columns), key=f"{key}_sort_by")
+    descending = col3.selectbox("Order", ["Descending", "Ascending"], key=f"{key}_order") == "Descending"
+    page_size = col4.selectbox("Rows", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    
+    # Reuse the filtered/sorted row order until the data, the query or the thresholds change
+    thresholds = get_status_thresholds(st.session_state)
+    filter_query = tuple((col, tuple(values)) for col, values in filters.items() if values)
+    query = (version, tuple(statuses), sort_by, descending, tuple(thresholds), search, filter_query)
+    cache = st.session_state.get(f"{key}_query")
+    if cache is None or cache['query'] != query:
+        rows = df
+        if filter_query or search:
+            # The bitmap and search indexes find the matching rows; only they are sorted
+            with st.spinner("Searching leads..."):
+                labels = filter_leads(st.session_state, filters, thresholds) if filter_query else None
+                if search:
+                    found = search_leads(st.session_state, search)
+                    labels = found if labels is None else labels[labels.isin(found)]
+                rows = df.loc[labels]
+        row_labels = query_leads(
+            rows,
+            statuses=statuses,
+            sort_by=None if sort_by == "Original order" else sort_by,
+            ascending=not descending,
+            thresholds=thresholds
+        )
+        cache = {'query': query, 'row_labels': row_labels}
+        st.session_state[f"{key}_query"] = cache
+    row_labels = cache['row_labels']
+    
+    total_pages = max(1, math.ceil(len(row_labels) / page_size))
+    page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1, key=f"{key}_page")
+    page = min(page, total_pages)
+    
+    page_df = apply_status_thresholds(get_page(df, row_labels, page, page_size), thresholds)
+    styled_page = page_df.style.apply(status_styles, axis=None)
+    
+    if selectable:
+        st.dataframe(styled_page, on_select="rerun", selection_mode="multi-row", key=f"{key}_table")
+    else:
+        st.dataframe(styled_page, key=f"{key}_table")
+    
+    start = (page - 1) * page_size
+    st.caption(f"Showing {start + 1 if len(page_df) else 0}-{start + len(page_df)} of {len(row_labels)} leads (page {page} of {total_pages})")
+    
+    return page_df
+
+def remove_selected_leads(page_labels):
+    """
+    Button callback that removes the rows selected in the leads table
+    
+    Args:
+        page_labels (pd.Index): Row labels of the leads on the visible page
+    """
+    selected_rows = st.session_state.your_leads_table.selection.rows
+    remove_leads(st.session_state, page_labels[selected_rows])
+
+def rescore_all_leads():
+    """Button callback that rescores the whole lead book"""
+    rescore_leads(st.session_state)
+
+@st.fragment
+def show_export_panel():
+    """Export the lead book in chunks, filtered by status and score"""
+    col1, col2, col3 = st.columns([2, 2, 3])
+    export_format = col1.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+    statuses = col2.multiselect("Status", ["Hot", "Warm", "Cold"], key="export_statuses")
+    score_range = col3.slider("Score", 0, 100, (0, 100), key="export_score_range")
+    
+    if st.button("Prepare Export", key="prepare_export"):
+        progress_bar = st.progress(0.0, text="Exporting leads...")
+        try:
+            export_file = export_leads(
+                get_leads(st.session_state),
+                export_format,
+                statuses=statuses,
+                thresholds=get_status_thresholds(st.session_state),
+                score_range=None if score_range == (0, 100) else score_range,
+                on_progress=lambda done: progress_bar.progress(done, text=f"Exporting leads... {done:.0%}")
+            )
+        except Exception as e:
+            progress_bar.empty()
+            st.error(f"Error exporting leads: {e}")
+            return
+        progress_bar.empty()
+        
+        # Only the file is kept; the previous export's file is deleted
+        previous = st.session_state.get('lead_export')
+        if previous is not None:
+            previous['file'].delete()
+        st.session_state.lead_export = {
+            'file': export_file,
+            'format': export_format,
+            'version': st.session_state.leads_version,
+        }
+    
+    export = st.session_state.get('lead_export')
+    if export is None:
+        return
+    
+    export_file = export['file']
+    if export_file.rows == 0:
+        st.info("No leads match these filters.")
+        return
+    
+    # The file is read from disk while the button is rendered, not held in session state
+    extension, mime = EXPORT_FORMATS[export['format']]
+    with export_file.open() as f:
+        st.download_button(
+            label=f"Download {export_file.rows:,} Leads ({export['format']})",
+            data=f,
+            file_name=f"scored_leads.{extension}",
+            mime=mime,
+            key="download_export",
+        )
+    if export['version'] != st.session_state.leads_version:
+        st.caption("Your leads have changed since this export was prepared.")
 
 def show_lead_upload_page():
     """Display the lead upload and scoring page"""
+    init_lead_book(st.session_state)
     st.title("Lead Upload & Scoring")
     st.markdown("Upload your leads and get AI-powered scoring to prioritize your efforts")
     
@@ -46,51 +217,111 @@ def show_lead_upload_page():
         )
         
         # Upload CSV
-        uploaded_file = st.file_uploader("Upload your leads CSV", type=["csv"])
+        incremental = st.toggle(
+            "Only score new or changed leads",
+            value=True,
+            key="incremental_upload",
+            help="Leads unchanged since your last upload keep their current scores; use Rescore All Leads to refresh them"
+        )
+        uploaded_files = st.file_uploader(
+            "Upload your leads CSVs",
+            type=["csv", "zip"],
+            accept_multiple_files=True,
+            help="Upload several branch files at once, or zip archives of them"
+        )
         
-        if uploaded_file is not None:
+        if uploaded_files:
             try:
-                # Load the CSV file
-                df = pd.read_csv(uploaded_file)
-                
-                # Validate the data
-                is_valid, message = validate_lead_data(df)
-                
-                if is_valid:
-                    # Preprocess data
-                    df = preprocess_lead_data(df)
+                # Process each set of uploaded files once; later reruns reuse the stored result
+                upload_id = tuple(uploaded_file.file_id for uploaded_file in uploaded_files)
+                if st.session_state.get('uploaded_file_id') != upload_id:
+                    # Validate, preprocess and score the files concurrently into the lead book
+                    with st.spinner(f"Scoring {len(uploaded_files)} file(s)..."):
+                        file_results, changes = load_lead_batch(
+                            st.session_state,
+                            [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files],
+                            incremental=incremental
+                        )
                     
-                    # Score the leads
-                    scored_df = score_leads(df)
+                    is_valid = any(result['is_valid'] for result in file_results)
+                    message = "; ".join(
+                        f"{result['name']}: {result['message']}" for result in file_results if not result['is_valid']
+                    )
                     
-                    # Update session state
-                    st.session_state.leads_df = scored_df
+                    # Only summary numbers are kept, so a replaced book isn't held in memory
+                    base = st.session_state.lead_base
+                    st.session_state.uploaded_file_id = upload_id
+                    st.session_state.upload_result = {
+                        'is_valid': is_valid,
+                        'message': message,
+                        'key': base.key if is_valid else None,
+                        'rows': len(base.df) if is_valid else 0,
+                        # Binned once, so moving the thresholds only sums histogram slices
+                        'score_counts': score_histogram(base.df['Score']) if is_valid else None,
+                    }
+                    st.session_state.upload_changes = changes
+                    st.session_state.upload_file_results = file_results
                     
+                    for result in file_results:
+                        if result['is_valid']:
+                            log_event(
+                                LEAD_UPLOAD,
+                                st.session_state.session_id,
+                                name=result['name'],
+                                rows=result['rows'],
+                                duration=result['seconds']
+                            )
+                
+                upload_result = st.session_state.upload_result
+                is_valid, message = upload_result['is_valid'], upload_result['message']
+                
+                # Per-file status and timing for batches
+                file_results = st.session_state.upload_file_results
+                if len(file_results) > 1:
+                    st.dataframe(
+                        pd.DataFrame({
+                            'File': [result['name'] for result in file_results],
+                            'Status': ["✅ Scored" if result['is_valid'] else "❌ Failed" for result in file_results],
+                            'Leads': [result['rows'] for result in file_results],
+                            'Time (s)': [round(result['seconds'], 2) for result in file_results],
+                            'Message': [result['message'] for result in file_results],
+                        }),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                
+                if is_valid:
                     # Success message
-                    st.success(f"Successfully processed {len(scored_df)} leads!")
-                    
-                    # Show the scored leads
-                    st.subheader("Scored Leads")
+                    st.success(f"Successfully processed {upload_result['rows']} leads!")
+                    if message:
+                        st.warning(f"Some files were skipped: {message}")
                     
-                    # Define a function to color the rows based on score
-                    def highlight_status(s):
-                        if s['Status'] == 'Hot':
-                            return ['background-color: #d4edda'] * len(s)
-                        elif s['Status'] == 'Warm':
-                            return ['background-color: #fff3cd'] * len(s)
-                        else:  # Cold
-                            return ['background-color: #f8d7da'] * len(s)
+                    changes = st.session_state.get('upload_changes')
+                    if changes is not None:
+                        st.info(
+                            f"Scored {changes['inserted']} new and {changes['changed']} changed leads, "
+                            f"kept {changes['unchanged']} unchanged leads as they were, "
+                            f"and dropped {changes['removed']} leads no longer uploaded."
+                            + (f" {changes['kept']} leads you entered by hand were kept." if changes['kept'] else "")
+                        )
                     
-                    # Apply styling and display
-                    st.dataframe(scored_df.style.apply(highlight_status, axis=1))
+                    # Show the scored leads while they're still the book's base
+                    base = st.session_state.lead_base
+                    if base is not None and base.key == upload_result['key']:
+                        st.subheader("Scored Leads")
+                        
+                        # Display one page at a time, styled by status
+                        show_leads_table(base.df, key="scored_leads", version=st.session_state.uploaded_file_id)
                     
                     # Show counts by status
                     st.subheader("Lead Summary")
                     col1, col2, col3 = st.columns(3)
                     
-                    hot_count = len(scored_df[scored_df['Status'] == 'Hot'])
-                    warm_count = len(scored_df[scored_df['Status'] == 'Warm'])
-                    cold_count = len(scored_df[scored_df['Status'] == 'Cold'])
+                    score_counts = upload_result['score_counts']
+                    thresholds = get_status_thresholds(st.session_state)
+                    hot_count = count_status(score_counts, 'Hot', thresholds)
+                    warm_count = count_status(score_counts, 'Warm', thresholds)
+                    cold_count = count_status(score_counts, 'Cold', thresholds)
                     
                     col1.metric("Hot Leads", hot_count)
                     col2.metric("Warm Leads", warm_count)
@@ -174,14 +405,14 @@ def show_lead_upload_page():
                         'Lead Source': [lead_source]
                     })
                     
+                    # Same canonical city names as uploaded leads
+                    new_lead['Location'] = normalize_locations(new_lead['Location'])
+                    
                     # Score the lead
                     scored_lead = score_leads(new_lead)
                     
                     # Append to existing leads
-                    if st.session_state.leads_df.empty:
-                        st.session_state.leads_df = scored_lead
-                    else:
-                        st.session_state.leads_df = pd.concat([st.session_state.leads_df, scored_lead], ignore_index=True)
+                    append_leads(st.session_state, scored_lead)
                     
                     # Success message
                     st.success(f"Added lead: {name} (Score: {scored_lead.iloc[0]['Score']}, Status: {scored_lead.iloc[0]['Status']})")
@@ -189,17 +420,27 @@ def show_lead_upload_page():
                     st.error("Name and Contact are required fields")
         
         # Show current leads if there are any
-        if not st.session_state.leads_df.empty:
+        leads_df = get_leads(st.session_state)
+        if not leads_df.empty:
             st.subheader("Your Leads")
             
-            # Define a function to color the rows based on score
-            def highlight_status(s):
-                if s['Status'] == 'Hot':
-                    return ['background-color: #d4edda'] * len(s)
-                elif s['Status'] == 'Warm':
-                    return ['background-color: #fff3cd'] * len(s)
-                else:  # Cold
-                    return ['background-color: #f8d7da'] * len(s)
+            # Display one page at a time, styled by status
+            page_df = show_leads_table(
+                leads_df,
+                key="your_leads",
+                version=st.session_state.leads_version,
+                selectable=True,
+                indexed=True
+            )
+            
+            col1, col2 = st.columns(2)
+            col1.button(
+                "Remove Selected Leads",
+                on_click=remove_selected_leads,
+                args=(page_df.index,),
+                disabled=not st.session_state.your_leads_table.selection.rows
+            )
+            col2.button("Rescore All Leads", on_click=rescore_all_leads, help="Update scores as contact dates age")
             
-            # Apply styling and display
-            st.dataframe(st.session_state.leads_df.style.apply(highlight_status, axis=1))
+            with st.expander("⬇️ Export Leads"):
+                show_export_panel()
@@ -0,0 +1,101 @@
+"""
+Morning batch job: build every rep's call lists for the day
+
+Each rep's leads are read from a CSV named after the rep (e.g. asha.csv),
+scored the same way as an upload, and joined to the day's product
+suggestions. The ranked lists for all reps are written to one CSV.
+
+Reps whose files have the same content share one scored book, so a team
+working from a common lead file is scored and matched once.
+
+Usage:
+    python scripts/daily_call_lists.py leads/*.csv --output call_lists.csv
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_books(paths):
+    """
+    Score each rep's lead file
+
+    Args:
+        paths (list): CSV paths, one per rep; the file name is the rep
+
+    Returns:
+        tuple: (rep -> scored leads DataFrame, list of (path, error message))
+    """
+    import pandas as pd
+    from utils.lead_scoring import score_leads, validate_lead_data, preprocess_lead_data
+
+    books, errors = {}, []
+    # File content hash -> scored leads, so identical files share one DataFrame
+    scored = {}
+    for path in paths:
+        rep = os.path.splitext(os.path.basename(path))[0]
+        try:
+            with open(path, 'rb') as f:
+                content_key = hashlib.sha1(f.read()).hexdigest()
+            if content_key not in scored:
+                df = pd.read_csv(path)
+                is_valid, message = validate_lead_data(df)
+                if not is_valid:
+                    errors.append((path, message))
+                    continue
+                scored[content_key] = score_leads(preprocess_lead_data(df))
+        except Exception as e:
+            errors.append((path, f"Error reading file: {e}"))
+            continue
+        books[rep] = scored[content_key]
+    return books, errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Build every rep's daily call lists from their lead files")
+    parser.add_argument('files', nargs='+', help="Lead CSV per rep, named after the rep")
+    parser.add_argument('--output', help="CSV to write, call_lists_<date>.csv by default")
+    parser.add_argument('--date', type=date.fromisoformat, default=None, help="Day to build lists for (YYYY-MM-DD), today by default")
+    parser.add_argument('--limit', type=int, default=None, help="Leads per product list")
+    parser.add_argument('--warm', type=int, default=None, help="Minimum Warm score")
+    parser.add_argument('--hot', type=int, default=None, help="Minimum Hot score")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from utils.call_lists import CALL_LIST_SIZE, build_daily_call_lists
+    from utils.lead_scoring import DEFAULT_THRESHOLDS
+
+    target_date = args.date or datetime.now().date()
+    thresholds = (
+        args.warm if args.warm is not None else DEFAULT_THRESHOLDS[0],
+        args.hot if args.hot is not None else DEFAULT_THRESHOLDS[1],
+    )
+    output = args.output or f"call_lists_{target_date.strftime('%Y%m%d')}.csv"
+
+    start = time.perf_counter()
+    books, errors = load_books(args.files)
+    scored_at = time.perf_counter()
+    call_lists = build_daily_call_lists(
+        books,
+        target_date=target_date,
+        thresholds=thresholds,
+        limit=args.limit or CALL_LIST_SIZE
+    )
+    built_at = time.perf_counter()
+    call_lists.to_csv(output, index=False)
+
+    print(f"Call lists for {target_date.isoformat()}: {len(call_lists):,} leads across {len(books)} reps -> {output}")
+    print(f"Scoring: {scored_at - start:.2f} s, matching: {built_at - scored_at:.2f} s")
+
+    if errors:
+        print()
+        print(f"{len(errors)} files skipped:")
+        for path, message in errors:
+            print(f"  {path}: {message}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
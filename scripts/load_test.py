@@ -0,0 +1,242 @@
+"""
+Load test for the Streamlit app
+
+Drives N concurrent headless sessions (Streamlit's AppTest) through a typical
+rep's flow - upload a CSV, add manual leads, chat with the coach, use a daily
+suggestion, open the dashboard - and reports per-step rerun latency
+percentiles, memory per session and throughput.
+
+Lottie fetches are served from the fallback animation and the event
+log, alias cache and animation cache go to a temporary directory, so the run
+is fully offline and leaves no state behind.
+
+AppTest installs a process-wide mock runtime for each script run, so runs
+from different sessions can't overlap. Sessions run in their own threads and
+take turns on the script runner. Latencies include the wait for a turn, the
+way a user of a busy server waits for its script thread, so they grow with
+the number of sessions; the time spent waiting is also reported on its own.
+Uploads are scored outside the runner, truly concurrently.
+
+Usage:
+    python scripts/load_test.py --sessions 20 --iterations 3 --leads 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'app.py')
+
+# Spellings the location normalizer has to resolve, as in real uploads
+LOCATIONS = ['Mumbai', 'Bombay', 'mumbai ', 'Delhi', 'New Delhi', 'Pune', 'Chennai', 'Bangalore', 'Bengaluru', 'Jaipur']
+PRODUCTS = ['Life Insurance', 'Health Insurance', 'Mutual Funds', 'Home Loan', 'Credit Card', 'Fixed Deposit']
+SOURCES = ['Referral', 'Website', 'Cold Call', 'Exhibition', 'Partner', 'Social Media']
+QUESTIONS = ["How do I close a hesitant lead?", "How to handle price objections?", "Tips for follow-up calls?"]
+
+# AppTest script runs share global runtime state, so only one runs at a time
+_runner_lock = threading.Lock()
+
+class Recorder:
+    """Thread-safe collection of rerun latencies per step"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.waits = defaultdict(list)
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds, waited=0.0):
+        with self._lock:
+            self.latencies[step].append(seconds * 1000)
+            self.waits[step].append(waited * 1000)
+
+    def error(self, session_no, step, message):
+        with self._lock:
+            self.errors.append((session_no, step, message))
+
+    def summary(self):
+        """Latency percentiles per step, in milliseconds"""
+        rows = []
+        for step, values in self.latencies.items():
+            values = np.array(values)
+            rows.append({
+                'Step': step,
+                'Runs': len(values),
+                'p50': np.percentile(values, 50),
+                'p90': np.percentile(values, 90),
+                'p99': np.percentile(values, 99),
+                'Max': values.max(),
+                'Wait p50': np.percentile(self.waits[step], 50),
+            })
+        return pd.DataFrame(rows).set_index('Step').round(1)
+
+    @property
+    def runs(self):
+        return sum(len(values) for values in self.latencies.values())
+
+def isolate_state(directory):
+    """Point every on-disk cache and log at a scratch directory; must run before app imports"""
+    os.environ['LOTTIE_CACHE_DIR'] = os.path.join(directory, 'lottie')
+    os.environ['EVENT_LOG_PATH'] = os.path.join(directory, 'events.db')
+    os.environ['LOCATION_ALIAS_CACHE'] = os.path.join(directory, 'location_aliases.json')
+
+def stub_lottie():
+    """Serve the fallback animation and refuse any network fetch"""
+    import requests
+    from assets import lottie_animations
+
+    for url in lottie_animations.COMMON_ANIMATIONS.values():
+        lottie_animations._memory_cache[url] = {
+            'animation': lottie_animations.get_fallback_animation(),
+            'etag': None,
+            'expires_at': float('inf'),
+        }
+
+    def offline_get(*args, **kwargs):
+        raise requests.ConnectionError("Load test runs offline")
+
+    lottie_animations._session.get = offline_get
+
+def make_leads_csv(rows, seed):
+    """Synthetic leads CSV as uploaded from the Lead Upload page"""
+    rng = np.random.default_rng(seed)
+    days_ago = pd.to_timedelta(rng.integers(0, 200, rows), unit='D')
+    return pd.DataFrame({
+        'Name': [f"Lead {seed}-{i}" for i in range(rows)],
+        'Contact': [f"98{(seed * rows + i) % 10**8:08d}" for i in range(rows)],
+        'Location': rng.choice(LOCATIONS, rows),
+        'Product Interest': rng.choice(PRODUCTS, rows),
+        'Last Contact Date': (pd.Timestamp.today() - days_ago).strftime('%Y-%m-%d'),
+        'Lead Source': rng.choice(SOURCES, rows),
+    }).to_csv(index=False).encode('utf-8')
+
+def get_rss_mb():
+    """Resident memory of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        import resource
+        # Peak rather than current outside Linux; kilobytes on Linux, bytes on macOS
+        scale = 2**20 if sys.platform == 'darwin' else 2**10
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+def run_step(at, recorder, session_no, step, action):
+    """Run one rerun-triggering action and record its latency, including the wait for the runner"""
+    start = time.perf_counter()
+    with _runner_lock:
+        waited = time.perf_counter() - start
+        action().run()
+    recorder.record(step, time.perf_counter() - start, waited)
+    for exception in at.exception:
+        recorder.error(session_no, step, exception.value)
+
+def run_session(session_no, args, csv_bytes, recorder):
+    """
+    Drive one session through the typical flow
+
+    Returns:
+        AppTest: The session, kept alive by the caller so its memory counts
+    """
+    from streamlit.testing.v1 import AppTest
+    from utils.lead_batch import load_lead_batch
+    from utils.lead_book import init_lead_book
+
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    run_step(at, recorder, session_no, "Open app", lambda: at)
+
+    def navigate(page):
+        run_step(at, recorder, session_no, page, lambda: at.sidebar.radio[0].set_value(page))
+
+    for iteration in range(args.iterations):
+        # AppTest can't drive st.file_uploader, so load the file the way the page does
+        init_lead_book(at.session_state)
+        start = time.perf_counter()
+        results, _ = load_lead_batch(at.session_state, [(f"leads_{session_no}.csv", csv_bytes)])
+        recorder.record("Upload CSV (score)", time.perf_counter() - start)
+        for result in results:
+            if not result['is_valid']:
+                recorder.error(session_no, "Upload CSV (score)", result['message'])
+        navigate("Lead Upload & Scoring")
+
+        for lead_no in range(args.manual_leads):
+            at.text_input[0].input(f"Manual Lead {session_no}-{iteration}-{lead_no}")
+            at.text_input[1].input("9876543210")
+            at.text_input[2].input(LOCATIONS[lead_no % len(LOCATIONS)])
+            run_step(at, recorder, session_no, "Add manual lead", lambda: [b for b in at.button if b.label == "Add Lead"][0].click())
+
+        navigate("AI Sales Coach")
+        at.text_input(key="user_query").input(QUESTIONS[iteration % len(QUESTIONS)])
+        run_step(at, recorder, session_no, "Coach chat", lambda: [b for b in at.button if b.label == "Send"][0].click())
+
+        navigate("Daily Sales Suggestions")
+        run_step(at, recorder, session_no, "Use suggestion", lambda: at.button(key="suggestion_0").click())
+
+        navigate("Performance Dashboard")
+        navigate("Home")
+
+    return at
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the sales coach app with concurrent headless sessions")
+    parser.add_argument('--sessions', type=int, default=10, help="Concurrent sessions to simulate")
+    parser.add_argument('--iterations', type=int, default=2, help="Times each session repeats the flow")
+    parser.add_argument('--leads', type=int, default=1000, help="Rows in each uploaded CSV")
+    parser.add_argument('--manual-leads', type=int, default=2, help="Leads added by hand per iteration")
+    parser.add_argument('--shared-file', action='store_true', help="Every session uploads the same CSV")
+    parser.add_argument('--timeout', type=float, default=120, help="Seconds allowed per rerun")
+    args = parser.parse_args()
+
+    scratch = tempfile.TemporaryDirectory(prefix='gromo-load-test-')
+    isolate_state(scratch.name)
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+    import warnings
+    warnings.filterwarnings('ignore')
+    stub_lottie()
+
+    # Warm up imports and caches so the baseline only excludes per-session state
+    csv_files = [make_leads_csv(args.leads, 0 if args.shared_file else session_no) for session_no in range(args.sessions)]
+    warmup = Recorder()
+    run_session(-1, argparse.Namespace(**{**vars(args), 'iterations': 1}), make_leads_csv(50, args.sessions), warmup)
+    for _, step, message in warmup.errors:
+        print(f"Warm-up error in {step}: {message}")
+
+    rss_before = get_rss_mb()
+    recorder = Recorder()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions, thread_name_prefix="load-test-session") as executor:
+        sessions = list(executor.map(
+            lambda session_no: run_session(session_no, args, csv_files[session_no], recorder),
+            range(args.sessions)
+        ))
+    elapsed = time.perf_counter() - start
+    rss_after = get_rss_mb()
+
+    print(f"Sessions: {args.sessions} x {args.iterations} iterations, {args.leads:,} leads per CSV"
+          f"{' (shared file)' if args.shared_file else ''}")
+    print(f"Wall time: {elapsed:.1f} s, reruns: {recorder.runs}, throughput: {recorder.runs / elapsed:.1f} reruns/s "
+          f"(script runs take turns, so this is the serial rate)")
+    print(f"Memory: {rss_before:.0f} MB -> {rss_after:.0f} MB RSS, "
+          f"{(rss_after - rss_before) / max(1, len(sessions)):.1f} MB per session")
+    print()
+    print("Rerun latency (ms), including the wait for the script runner")
+    print(recorder.summary().to_string())
+
+    if recorder.errors:
+        print()
+        print(f"{len(recorder.errors)} errors, first few:")
+        for session_no, step, message in recorder.errors[:5]:
+            print(f"  session {session_no}, {step}: {message}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
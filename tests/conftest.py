@@ -0,0 +1,30 @@
+import os
+import tempfile
+import pytest
+
+# Keep the location alias cache and event log out of the user's home directory;
+# set before any app module is imported
+_scratch = tempfile.mkdtemp(prefix='gromo-tests-')
+os.environ.setdefault('LOCATION_ALIAS_CACHE', os.path.join(_scratch, 'location_aliases.json'))
+os.environ.setdefault('EVENT_LOG_PATH', os.path.join(_scratch, 'events.db'))
+
+class SessionState(dict):
+    """Stand-in for st.session_state: a dict with attribute access"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+@pytest.fixture
+def state():
+    """Empty session state with the lead book initialized"""
+    from utils.lead_book import init_lead_book
+
+    session_state = SessionState()
+    init_lead_book(session_state)
+    return session_state
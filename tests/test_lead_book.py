@@ -0,0 +1,89 @@
+import pandas as pd
+from datetime import date, timedelta
+from utils.lead_aggregates import LeadAggregates
+from utils.lead_batch import load_lead_batch
+from utils.lead_book import get_leads, append_leads, remove_leads
+from utils.lead_scoring import score_leads, preprocess_lead_data
+
+def make_lead(contact, product='Life Insurance', name=None, days_ago=10):
+    """One raw lead row as it appears in an uploaded CSV"""
+    return {
+        'Name': name or f"Lead {contact}",
+        'Contact': contact,
+        'Location': 'Mumbai',
+        'Product Interest': product,
+        'Last Contact Date': (date.today() - timedelta(days=days_ago)).isoformat(),
+        'Lead Source': 'Referral',
+    }
+
+def make_csv(rows):
+    """Uploaded CSV file bytes"""
+    return pd.DataFrame(rows).to_csv(index=False).encode('utf-8')
+
+def add_by_hand(state, contact, name):
+    """Add a lead the way the Manual Entry form does"""
+    lead = pd.DataFrame([make_lead(contact, name=name)])
+    append_leads(state, score_leads(preprocess_lead_data(lead)))
+
+def assert_aggregates_match(state):
+    """The running counts equal a recount of the book"""
+    expected = LeadAggregates.from_frame(get_leads(state))
+    actual = state.lead_aggregates
+    assert actual.total == expected.total
+    assert (actual.score_counts == expected.score_counts).all()
+    for col, counts in expected.column_counts.items():
+        assert +actual.column_counts[col] == +counts
+    assert +actual.product_scores == +expected.product_scores
+    assert {product: +days for product, days in actual.product_contacts.items() if +days} == \
+        {product: +days for product, days in expected.product_contacts.items() if +days}
+
+def test_reupload_keeps_hand_entered_leads(state):
+    first = [make_lead(f"90000000{i:02d}") for i in range(1, 6)]
+    results, _ = load_lead_batch(state, [('leads.csv', make_csv(first))])
+    assert results[0]['is_valid']
+
+    add_by_hand(state, '9111111111', 'Walk-in')
+    add_by_hand(state, '9000000006', 'Phoned in')
+    add_by_hand(state, '9222222222', 'Wrong number')
+    book = get_leads(state)
+    # One uploaded lead and one hand-entered lead are removed again
+    remove_leads(state, book.index[book['Contact'].isin(['9000000002', '9222222222'])])
+    assert_aggregates_match(state)
+
+    # 01 and 04 unchanged, 03 edited, 05 gone, 06 now uploaded too, 07 new
+    second = [
+        make_lead('9000000001'),
+        make_lead('9000000003', product='Home Loan'),
+        make_lead('9000000004'),
+        make_lead('9000000006', name='Lead from file'),
+        make_lead('9000000007'),
+    ]
+    results, changes = load_lead_batch(state, [('leads.csv', make_csv(second))])
+    assert results[0]['is_valid']
+    assert changes == {'inserted': 1, 'changed': 2, 'unchanged': 2, 'removed': 1, 'kept': 1}
+
+    book = get_leads(state)
+    assert book['Contact'].tolist() == ['9000000001', '9000000003', '9000000004', '9000000006', '9000000007', '9111111111']
+    # Uploaded rows are labelled 0..n-1 and the kept lead continues from n
+    assert book.index.tolist() == list(range(6))
+    assert book.loc[1, 'Product Interest'] == 'home loan'
+    assert book.loc[3, 'Name'] == 'Lead from file'
+    assert book.loc[5, 'Name'] == 'Walk-in'
+    assert_aggregates_match(state)
+
+def test_same_file_again_keeps_hand_entered_leads(state):
+    content = make_csv([make_lead(f"91000000{i:02d}") for i in range(1, 4)])
+    load_lead_batch(state, [('same.csv', content)])
+    add_by_hand(state, '9333333333', 'Walk-in')
+    add_by_hand(state, '9100000002', 'Also in the file')
+    remove_leads(state, [0])
+
+    # The identical file reopens the shared dataset: its leads come back as
+    # uploaded, and only the hand-entered lead not in the file is kept
+    results, changes = load_lead_batch(state, [('same.csv', content)])
+    assert results[0]['is_valid'] and changes is None
+
+    book = get_leads(state)
+    assert book['Contact'].tolist() == ['9100000001', '9100000002', '9100000003', '9333333333']
+    assert book.index.tolist() == list(range(4))
+    assert_aggregates_match(state)
@@ -0,0 +1,79 @@
+import re
+import pandas as pd
+import pytest
+from utils.lead_book import get_leads, replace_leads, append_leads, remove_leads
+from utils.lead_scoring import score_leads, preprocess_lead_data
+from utils.lead_search import NGRAM_SIZE, parse_search, search_leads
+
+QUERIES = [
+    'a', 'as', 'sha', 'asha', 'ASHA', 'mum', 'mumbai', 'bai', 'pune asha', 'zoë', 'oë',
+    'example', 'com', 'k', '98', '98765', '6543', '919876543210', '12345', 'xyz', 'added', 'late',
+]
+
+def make_leads(rows):
+    """Scored leads from (name, contact, location) rows"""
+    df = pd.DataFrame(rows, columns=['Name', 'Contact', 'Location']).assign(**{
+        'Product Interest': 'Life Insurance',
+        'Last Contact Date': '2024-01-15',
+        'Lead Source': 'Referral',
+    })
+    return score_leads(preprocess_lead_data(df))
+
+def brute_force_search(df, query):
+    """
+    Labels of the leads matching every term, by scanning the text
+
+    Terms shorter than an n-gram match the start of a word, longer ones
+    anywhere in a word; a multi-word Contact's digits also count as one word.
+    """
+    contact = df['Contact'].astype(str)
+    joined_digits = contact.str.casefold().str.findall(r'\w+').map(
+        lambda words: ''.join(word for word in words if word.isdigit()) if len(words) > 1 else ''
+    )
+    text = (df['Name'].astype(str) + ' ' + contact + ' ' + joined_digits + ' ' + df['Location'].astype(str)).str.casefold()
+
+    matches = pd.Series(True, index=df.index)
+    for term in parse_search(query):
+        term = term.decode('utf-8')
+        if len(term.encode('utf-8')) < NGRAM_SIZE:
+            matches &= text.str.contains(r'(?<!\w)' + re.escape(term))
+        else:
+            matches &= text.str.contains(term, regex=False)
+    return df.index[matches].tolist()
+
+@pytest.fixture
+def book(state):
+    """A lead book with uploaded, added and removed leads, searched once between edits"""
+    replace_leads(state, make_leads([
+        ('Asha Kumar', '9876543210', 'Mumbai'),
+        ('Rahul Sharma', '+91 98765 43210', 'Bombay'),
+        ('Zoë Fernandes', 'asha.k@example.com', 'Pune'),
+        ('Ashok Mehta', '080-12345678', 'Bangalore'),
+        ('Priya Nair', '9123456789', 'Kochi'),
+        ('Kashif Ali', '91234 56780', 'Pune'),
+    ]))
+    append_leads(state, make_leads([('Added Asha', '9988776655', 'Pune')]))
+    # Index the book, then change it so results have to follow the overlay
+    search_leads(state, 'asha')
+    remove_leads(state, [0, 6])
+    append_leads(state, make_leads([
+        ('Late Addition', '98765 00000', 'Mumbai'),
+        ('Mohan Shah', 'mohan@example.com', 'Delhi'),
+    ]))
+    remove_leads(state, [8])
+    return state
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_search_matches_brute_force(book, query):
+    expected = brute_force_search(get_leads(book), query)
+    assert sorted(search_leads(book, query).tolist()) == sorted(expected)
+
+def test_search_leaves_out_removed_leads(book):
+    # Asha Kumar (base) and Added Asha (added) were removed after indexing
+    assert sorted(search_leads(book, 'asha').tolist()) == [2]
+    assert search_leads(book, 'mohan').empty
+    assert search_leads(book, 'late').tolist() == [7]
+
+def test_contact_digits_are_joined(book):
+    assert search_leads(book, '919876543210').tolist() == [1]
+    assert search_leads(book, '9876500000').tolist() == [7]
@@ -97,3 +97,75 @@ def get_sales_tip_of_the_day():
     # Use the day of year to select a tip, so it changes daily but is consistent throughout the day
     day_of_year = datetime.now().timetuple().tm_yday
     return tips[day_of_year % len(tips)]
+
+def generate_lead_pitch(product_interest, lead_source, location, recency):
+    """
+    Generate a tailored opening line for a lead
+    
+    Args:
+        product_interest (str): Product the lead is interested in
+        lead_source (str): How the lead was acquired
+        location (str): Lead's city or region
+        recency (str): 'recent', 'this_month' or 'lapsed' contact
+        
+    Returns:
+        str: Opener with a {name} placeholder for the lead's first name
+    """
+    product_lower = str(product_interest).lower()
+    source_lower = str(lead_source).lower()
+    
+    # Product-specific hooks, checked in order so specific products win over generic ones
+    product_hooks = [
+        ("health", "protecting themselves from rising hospital bills"),
+        ("life", "securing their family's future with term cover"),
+        ("motor", "saving on their vehicle insurance renewals"),
+        ("insurance", "getting the right protection at an affordable premium"),
+        ("mutual fund", "building wealth with small monthly SIPs"),
+        ("investment", "growing their savings with disciplined investing"),
+        ("gold", "buying digital gold as a safe, hassle-free investment"),
+        ("fixed deposit", "locking in assured returns on their savings"),
+        ("home loan", "moving into their own home with easy EMIs"),
+        ("loan", "getting quick funds at competitive interest rates"),
+        ("credit card", "earning rewards on their everyday spending"),
+    ]
+    hook = "making smarter financial decisions"
+    for keyword, product_hook in product_hooks:
+        if keyword in product_lower:
+            hook = product_hook
+            break
+    
+    # How we reached this lead
+    source_phrases = {
+        "referral": "someone who trusts us suggested I reach out to you",
+        "existing customer": "as one of our valued customers, you get first access to this",
+        "partner": "our partner thought this would be a good fit for you",
+        "website": "I saw you were exploring options on our website",
+        "social media": "I noticed your interest through our social media page",
+        "exhibition": "we met briefly at the exhibition",
+        "advertisement": "you responded to one of our recent offers",
+        "cold call": "I'm reaching out because this could genuinely help you",
+    }
+    source_phrase = "I wanted to share something that could help you"
+    for keyword, phrase in source_phrases.items():
+        if keyword in source_lower:
+            source_phrase = phrase
+            break
+    
+    # Open differently depending on when we last spoke
+    recency_openers = {
+        "recent": "great speaking with you earlier this week",
+        "this_month": "it's been a couple of weeks since we spoke",
+        "lapsed": "it's been a while since we last connected",
+    }
+    opener = recency_openers.get(recency, recency_openers["lapsed"])
+    
+    location_text = str(location).strip()
+    if location_text and location_text.lower() not in ("unknown", "nan"):
+        audience = f"Many people in {location_text.title()} are {hook}"
+    else:
+        audience = f"Many of our customers are {hook}"
+    
+    return (
+        f"Hi {{name}}, {opener} - {source_phrase}. {audience}. "
+        f"Could I take 5 minutes to show you how our {str(product_interest).title()} option could work for you?"
+    )
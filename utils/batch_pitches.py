@@ -0,0 +1,108 @@
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from utils.ai_coach import generate_lead_pitch
+
+# Lead statuses worth a personalized opener
+PITCH_STATUSES = ('Hot', 'Warm')
+
+# Normalized copy of each lead column a pitch depends on; the originals are left as entered
+SIGNATURE_KEYS = {'Product Interest': 'product_key', 'Lead Source': 'source_key', 'Location': 'location_key'}
+
+# Columns that fully determine a pitch - leads sharing them share one generation
+SIGNATURE_COLUMNS = list(SIGNATURE_KEYS.values()) + ['Recency']
+
+# Columns included in the pitch table
+PITCH_COLUMNS = ['Name', 'Contact', 'Status', 'Score', 'Product Interest', 'Lead Source', 'Location', 'Pitch']
+
+def get_recency_bucket(last_contact_dates):
+    """
+    Bucket contact dates into the recency groups used by pitches
+
+    Args:
+        last_contact_dates (pd.Series): Last contact dates
+
+    Returns:
+        pd.Series: 'recent', 'this_month' or 'lapsed' per lead
+    """
+    days = (pd.to_datetime(datetime.today()) - pd.to_datetime(last_contact_dates, errors='coerce')).dt.days
+    recency = pd.Series('lapsed', index=last_contact_dates.index)
+    recency[days <= 30] = 'this_month'
+    recency[days <= 7] = 'recent'
+    return recency
+
+def select_pitch_leads(leads_df, statuses=PITCH_STATUSES):
+    """
+    Pick the leads to pitch and attach their normalized prompt signature columns
+
+    Args:
+        leads_df (pd.DataFrame): Scored leads
+        statuses (tuple): Lead statuses to include
+
+    Returns:
+        pd.DataFrame: Selected leads with SIGNATURE_COLUMNS added
+    """
+    if leads_df.empty or 'Status' not in leads_df.columns:
+        return pd.DataFrame(columns=PITCH_COLUMNS[:-1] + SIGNATURE_COLUMNS)
+
+    selected = leads_df[leads_df['Status'].isin(statuses)].copy()
+    for col, key in SIGNATURE_KEYS.items():
+        if col not in selected.columns:
+            selected[col] = 'Unknown'
+        selected[key] = selected[col].astype(object).fillna('Unknown').astype(str).str.strip().str.lower()
+
+    if 'Last Contact Date' in selected.columns:
+        selected['Recency'] = get_recency_bucket(selected['Last Contact Date'])
+    else:
+        selected['Recency'] = 'lapsed'
+
+    return selected
+
+def _personalize(template, names):
+    """Fill the {name} placeholder with each lead's first name"""
+    first_names = names.fillna('there').astype(str).str.split().str[0].fillna('there')
+    return first_names.map(lambda first_name: template.replace('{name}', first_name))
+
+def generate_batch_pitches(leads_df, statuses=PITCH_STATUSES, max_concurrency=8):
+    """
+    Generate a tailored opener for every Hot/Warm lead
+
+    Each distinct prompt signature (product, source, location, recency) is
+    generated once, with at most max_concurrency generations in flight.
+    Results are yielded as soon as each signature completes.
+
+    Args:
+        leads_df (pd.DataFrame): Scored leads
+        statuses (tuple): Lead statuses to include
+        max_concurrency (int): Maximum number of concurrent generations
+
+    Yields:
+        tuple: (leads_done, total_leads, pd.DataFrame chunk of pitches)
+    """
+    selected = select_pitch_leads(leads_df, statuses)
+    total = len(selected)
+    if total == 0:
+        return
+
+    # Row positions per unique signature
+    signature_rows = selected.groupby(SIGNATURE_COLUMNS, sort=False).indices
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="pitch-worker") as executor:
+        futures = {
+            executor.submit(generate_lead_pitch, *signature): positions
+            for signature, positions in signature_rows.items()
+        }
+
+        for future in as_completed(futures):
+            positions = futures[future]
+            chunk = selected.iloc[positions]
+            try:
+                pitches = _personalize(future.result(), chunk['Name'])
+            except Exception as e:
+                print(f"Error generating pitch: {e}")
+                pitches = pd.Series('', index=chunk.index)
+
+            chunk = chunk.assign(Pitch=pitches)
+            done += len(chunk)
+            yield done, total, chunk[[col for col in PITCH_COLUMNS if col in chunk.columns]]
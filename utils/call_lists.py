@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+from utils.lead_aggregates import SCORE_BINS
+from utils.lead_book import get_leads
+from utils.lead_scoring import DEFAULT_THRESHOLDS, get_status
+from utils.daily_suggestions import get_daily_suggestions
+from utils.status_thresholds import get_status_thresholds
+
+# Lead statuses worth a call on a product's day
+CALL_STATUSES = ('Hot', 'Warm')
+
+# Leads on each product's call list
+CALL_LIST_SIZE = 25
+
+# Columns included in a call list, after Rank
+CALL_LIST_COLUMNS = ['Name', 'Contact', 'Status', 'Score', 'Product Interest', 'Location', 'Last Contact Date']
+
+def match_products(products, suggestions):
+    """
+    Match the distinct Product Interest values against each suggestion's keywords
+
+    Only the distinct values are compared, so the cost doesn't grow with the
+    number of leads.
+
+    Args:
+        products (pd.Index): Distinct lowercase Product Interest values
+        suggestions (list): Suggestion dictionaries with lowercase keywords
+
+    Returns:
+        np.ndarray: Boolean matrix, one row per suggestion and one column per product
+    """
+    values = np.asarray(products, dtype=str)
+    matches = np.zeros((len(suggestions), len(values)), dtype=bool)
+    for i, suggestion in enumerate(suggestions):
+        for keyword in suggestion.get('keywords', ()):
+            matches[i] |= np.char.find(values, keyword) >= 0
+    return matches
+
+def build_call_lists(df, suggestions, thresholds=DEFAULT_THRESHOLDS, statuses=CALL_STATUSES, limit=CALL_LIST_SIZE):
+    """
+    Rank the leads to call for each of the day's suggested products
+
+    Leads are joined to suggestions through their Product Interest code, and
+    every list is cut from one ordering of the eligible leads: highest score
+    first, then the longest since last contact.
+
+    Args:
+        df (pd.DataFrame): Scored leads
+        suggestions (list): The day's suggestion dictionaries
+        thresholds (tuple): (warm, hot) minimum scores
+        statuses (tuple): Lead statuses to include
+        limit (int): Leads per list
+
+    Returns:
+        list: (suggestion, pd.DataFrame of ranked leads) per suggestion, in suggestion order
+    """
+    columns = ['Rank'] + [col for col in CALL_LIST_COLUMNS if col in df.columns or col == 'Status']
+    if df.empty or 'Score' not in df.columns or not suggestions:
+        return [(suggestion, pd.DataFrame(columns=columns)) for suggestion in suggestions]
+
+    # Status only depends on the score, so decide it once per possible score
+    scores = pd.to_numeric(df['Score'], errors='coerce').fillna(0).astype(int).clip(0, SCORE_BINS - 1).to_numpy()
+    eligible_scores = np.isin(get_status(np.arange(SCORE_BINS), *thresholds), statuses)
+    rows = np.flatnonzero(eligible_scores[scores])
+
+    if 'Product Interest' in df.columns:
+        codes, products = pd.factorize(df['Product Interest'].to_numpy()[rows], use_na_sentinel=False)
+        products = pd.Index(products).astype(str).str.strip().str.lower()
+    else:
+        codes, products = np.zeros(len(rows), dtype=np.intp), pd.Index(['unknown'])
+
+    if 'Last Contact Date' in df.columns:
+        # Never-contacted leads sort as the longest since contact
+        last_contact = pd.to_datetime(df['Last Contact Date'].iloc[rows], errors='coerce').to_numpy().view(np.int64)
+    else:
+        last_contact = np.zeros(len(rows), dtype=np.int64)
+
+    # One ordering shared by every list
+    order = np.lexsort((last_contact, -scores[rows]))
+    matches = match_products(products, suggestions)[:, codes[order]]
+
+    call_lists = []
+    for suggestion, suggestion_matches in zip(suggestions, matches):
+        picked = rows[order[np.flatnonzero(suggestion_matches)[:limit]]]
+        leads = df.iloc[picked].assign(Status=get_status(scores[picked], *thresholds))
+        leads.insert(0, 'Rank', np.arange(1, len(leads) + 1))
+        call_lists.append((suggestion, leads[columns]))
+    return call_lists
+
+def get_call_lists(state, suggestions, limit=CALL_LIST_SIZE):
+    """
+    Get the call lists for the session's lead book, rebuilt only when the book,
+    thresholds or suggestions change
+
+    Args:
+        state: Streamlit session state
+        suggestions (list): The day's suggestion dictionaries, as shown to the user
+        limit (int): Leads per list
+
+    Returns:
+        list: (suggestion, pd.DataFrame of ranked leads) per suggestion
+    """
+    thresholds = tuple(get_status_thresholds(state))
+    key = (state.leads_version, thresholds, limit,
+           tuple((suggestion['product'], suggestion.get('keywords', ())) for suggestion in suggestions))
+    cache = state.get('call_lists')
+    if cache is None or cache['key'] != key:
+        cache = {'key': key, 'lists': build_call_lists(get_leads(state), suggestions, thresholds, limit=limit)}
+        state.call_lists = cache
+    return cache['lists']
+
+def build_daily_call_lists(books, target_date=None, thresholds=DEFAULT_THRESHOLDS, limit=CALL_LIST_SIZE):
+    """
+    Build every rep's call lists for a day in one batch, e.g. from a morning job
+
+    Suggestions come from the compiled rules once per day; reps sharing the
+    same lead DataFrame, such as a teammate's shared dataset, are matched once.
+
+    Args:
+        books (dict): Rep -> scored leads DataFrame
+        target_date (date, optional): Day to build the lists for, defaults to today
+        thresholds (tuple): (warm, hot) minimum scores
+        limit (int): Leads per list
+
+    Returns:
+        pd.DataFrame: One row per listed lead, with Rep, Product and Rank first
+    """
+    suggestions = get_daily_suggestions(target_date)
+
+    built = {}
+    frames = []
+    for rep, df in books.items():
+        if id(df) not in built:
+            built[id(df)] = build_call_lists(df, suggestions, thresholds, limit=limit)
+        for suggestion, leads in built[id(df)]:
+            if not leads.empty:
+                frames.append(leads.assign(Rep=rep, Product=suggestion['product']))
+
+    if not frames:
+        return pd.DataFrame(columns=['Rep', 'Product', 'Rank'] + CALL_LIST_COLUMNS)
+    call_lists = pd.concat(frames, ignore_index=True)
+    return call_lists[['Rep', 'Product'] + [col for col in call_lists.columns if col not in ('Rep', 'Product')]]
@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.ai_coach import generate_ai_response, get_sales_tip_of_the_day
+
+# Shared pool settings - every session submits into the same bounded pool
+MAX_WORKERS = 4
+MAX_QUEUE_DEPTH = 32
+JOB_TIMEOUT_SECONDS = 30
+
+# Shown in place of a reply dropped because the user left the chat
+CANCELLED_RESPONSE = "Reply cancelled because you left the chat. Ask again whenever you're ready."
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="coach-worker")
+
+# One slot per running or queued job; submissions beyond this are rejected
+_slots = threading.BoundedSemaphore(MAX_WORKERS + MAX_QUEUE_DEPTH)
+
+class CoachJob:
+    """Handle to a coach reply being generated in the shared worker pool"""
+
+    def __init__(self, user_input):
+        self.user_input = user_input
+        self.submitted_at = time.monotonic()
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def elapsed(self):
+        """Seconds since the job was submitted"""
+        return time.monotonic() - self.submitted_at
+
+    def wait(self, timeout=None):
+        """
+        Wait for the reply to be ready
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait
+
+        Returns:
+            bool: True if the job has finished
+        """
+        try:
+            self.future.exception(timeout=timeout)
+        except Exception:
+            pass
+        return self.future.done()
+
+    def result(self):
+        """
+        Get the generated reply, degrading to a fallback message on failure
+
+        Returns:
+            str: AI response
+        """
+        if self.cancelled or self.future.cancelled():
+            return get_busy_response()
+        try:
+            return self.future.result(timeout=0)
+        except Exception as e:
+            print(f"Error generating coach reply: {e}")
+            return get_busy_response()
+
+    def cancel(self):
+        """Cancel the job; a reply that is already running is discarded"""
+        self._cancelled.set()
+        self.future.cancel()
+
+def _run_job(job, chat_history):
+    """Worker entry point - skip jobs cancelled while they were queued"""
+    if job.cancelled:
+        return None
+    return generate_ai_response(job.user_input, chat_history)
+
+def submit_coach_job(user_input, chat_history=None):
+    """
+    Queue a coach reply in the shared worker pool
+
+    Args:
+        user_input (str): User's question or prompt
+        chat_history (list, optional): List of previous chat exchanges
+
+    Returns:
+        CoachJob: Handle for the queued job, or None if the queue is full
+    """
+    if not _slots.acquire(blocking=False):
+        return None
+
+    job = CoachJob(user_input)
+
+    # Snapshot the history so the worker never sees later session edits
+    history = list(chat_history) if chat_history else []
+    try:
+        job.future = _executor.submit(_run_job, job, history)
+    except Exception:
+        _slots.release()
+        raise
+
+    # Free the slot once the job finishes or is cancelled while queued
+    job.future.add_done_callback(lambda _: _slots.release())
+    return job
+
+def cancel_coach_job(job):
+    """
+    Cancel a pending coach job, if any
+
+    Args:
+        job (CoachJob): Job handle, may be None
+    """
+    if job is not None:
+        job.cancel()
+
+def get_busy_response():
+    """
+    Reply used when the coach is overloaded or a job cannot complete
+
+    Returns:
+        str: Fallback response
+    """
+    return f"I'm helping a lot of agents right now, so here's a quick tip while you wait: {get_sales_tip_of_the_day()} Please ask me again in a moment."
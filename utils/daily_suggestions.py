@@ -1,136 +1,348 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime
+import json
+import os
+import threading
+import time
+from datetime import datetime, date, timedelta
+from utils.lead_scoring import DEFAULT_THRESHOLDS
+from utils.status_thresholds import get_status_thresholds
 
-def get_daily_suggestions():
-    """
-    Generate daily product suggestions based on day, trends, and rule-based logic
-    
-    Returns:
-        list: List of dictionaries with product suggestions
-    """
-    today = datetime.now()
-    day_of_week = today.weekday()  # 0-6 (Monday is 0)
-    month = today.month
-    
-    # Base suggestions that work anytime
-    base_suggestions = [
+# Suggestion rules live in a JSON file so campaigns can change without a redeploy.
+# Each rule is a suggestion (product, reason, approach, icon, keywords) plus:
+#   priority     - higher ranks first; ties keep file order
+#   weekdays     - e.g. ["Monday", "Friday"]; omitted means every day
+#   months       - e.g. [3, "6-9", "11-2"]; omitted means every month
+#   date_windows - e.g. [{"from": "03-15", "to": "03-31"}], recurring yearly
+# "slots" sets how many suggestions are shown per day.
+RULES_PATH = os.environ.get(
+    'SUGGESTION_RULES_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suggestion_rules.json')
+)
+
+# How often the watcher checks the rules file for changes
+RULES_POLL_SECONDS = 2
+
+# Number of suggestions shown per day when the rules file doesn't say
+DEFAULT_SLOTS = 5
+
+# How much lead demand and recent contact activity add to a rule's priority
+LEAD_INTEREST_WEIGHT = 3
+LEAD_RECENCY_WEIGHT = 1
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Fields copied from a rule into the suggestion shown to users
+SUGGESTION_FIELDS = ('product', 'reason', 'approach', 'icon', 'keywords')
+
+# Everyday products used until a valid rules file can be loaded
+DEFAULT_RULES = {
+    'slots': 3,
+    'rules': [
         {
-            "product": "Term Life Insurance",
-            "reason": "Always a high-commission product with essential protection for customers",
-            "approach": "Focus on family security and peace of mind",
-            "icon": "shield-check"
+            'product': 'Term Life Insurance',
+            'reason': 'Always a high-commission product with essential protection for customers',
+            'approach': 'Focus on family security and peace of mind',
+            'icon': 'shield-check',
+            'keywords': ['life', 'term'],
         },
         {
-            "product": "Health Insurance",
-            "reason": "Year-round necessity with increasing awareness",
-            "approach": "Emphasize rising healthcare costs and tax benefits",
-            "icon": "heart-pulse"
+            'product': 'Health Insurance',
+            'reason': 'Year-round necessity with increasing awareness',
+            'approach': 'Emphasize rising healthcare costs and tax benefits',
+            'icon': 'heart-pulse',
+            'keywords': ['health'],
         },
         {
-            "product": "SIP Investment Plans",
-            "reason": "Long-term wealth building solution for all customer segments",
-            "approach": "Start with small amounts and show compounding benefits",
-            "icon": "trending-up"
-        }
-    ]
-    
-    # Day of week specific suggestions
-    day_specific = {
-        0: {  # Monday
-            "product": "Accident Insurance",
-            "reason": "Start of work week - people think about safety",
-            "approach": "Quick 10-minute signup for year-long protection",
-            "icon": "alert-triangle"
+            'product': 'SIP Investment Plans',
+            'reason': 'Long-term wealth building solution for all customer segments',
+            'approach': 'Start with small amounts and show compounding benefits',
+            'icon': 'trending-up',
+            'keywords': ['sip', 'mutual fund', 'investment'],
         },
-        1: {  # Tuesday
-            "product": "Child Education Plans",
-            "reason": "Parents are in planning mode mid-week",
-            "approach": "Show long-term education cost inflation data",
-            "icon": "book-open"
-        },
-        2: {  # Wednesday
-            "product": "Retirement Plans",
-            "reason": "Mid-week is ideal for long-term planning discussions",
-            "approach": "Use retirement calculators to show the gap",
-            "icon": "umbrella"
-        },
-        3: {  # Thursday
-            "product": "Health Insurance Add-ons",
-            "reason": "Good day for upgrading existing customers",
-            "approach": "Critical illness and outpatient coverage upsells",
-            "icon": "plus-circle"
-        },
-        4: {  # Friday
-            "product": "Travel Insurance",
-            "reason": "Weekend trip planning makes this relevant",
-            "approach": "Quick digital policy issuance for weekend travelers",
-            "icon": "map"
-        },
-        5: {  # Saturday
-            "product": "Family Floater Policies",
-            "reason": "Weekend family time makes protection relevant",
-            "approach": "Cover the whole family under one premium",
-            "icon": "users"
-        },
-        6: {  # Sunday
-            "product": "Investment Review",
-            "reason": "Relaxed day for financial planning",
-            "approach": "Offer free portfolio assessment and rebalancing",
-            "icon": "bar-chart-2"
+    ],
+}
+
+# Any leap year works - it's only used to enumerate every (month, day)
+_ALL_DAYS = [date(2024, 1, 1) + timedelta(days=offset) for offset in range(366)]
+
+def _parse_months(months):
+    """Expand month entries like 3 or "6-9" (ranges may wrap, e.g. "11-2")"""
+    expanded = set()
+    for entry in months:
+        if isinstance(entry, int):
+            expanded.add(entry)
+            continue
+        start, _, end = str(entry).partition('-')
+        start, end = int(start), int(end or start)
+        month = start
+        while True:
+            expanded.add(month)
+            if month == end:
+                break
+            month = month % 12 + 1
+    if not expanded <= set(range(1, 13)):
+        raise ValueError(f"Invalid months: {months}")
+    return expanded
+
+def _parse_month_day(value):
+    """Parse a "MM-DD" string into a (month, day) tuple"""
+    month, day = (int(part) for part in value.split('-'))
+    date(2024, month, day)  # validates the day
+    return month, day
+
+def _rule_matcher(rule):
+    """
+    Build a predicate for a rule's date conditions
+    
+    Args:
+        rule (dict): Rule from the rules file
+    
+    Returns:
+        function: Takes (month, day, weekday) and returns True if the rule applies
+    """
+    weekdays = None
+    if 'weekdays' in rule:
+        weekdays = {WEEKDAYS.index(str(weekday).lower()) for weekday in rule['weekdays']}
+    
+    months = _parse_months(rule['months']) if 'months' in rule else None
+    
+    windows = None
+    if 'date_windows' in rule:
+        windows = [
+            (_parse_month_day(window['from']), _parse_month_day(window['to']))
+            for window in rule['date_windows']
+        ]
+    
+    def matches(month, day, weekday):
+        if weekdays is not None and weekday not in weekdays:
+            return False
+        if months is not None and month not in months:
+            return False
+        if windows is not None:
+            month_day = (month, day)
+            return any(
+                start <= month_day <= end if start <= end else (month_day >= start or month_day <= end)
+                for start, end in windows
+            )
+        return True
+    
+    return matches
+
+def compile_rules(config):
+    """
+    Compile suggestion rules into a lookup table keyed by (month, day, weekday)
+    
+    Args:
+        config (dict): Parsed rules file
+    
+    Returns:
+        dict: Compiled rules with 'candidates' and 'suggestions' tables
+    """
+    slots = int(config.get('slots', DEFAULT_SLOTS))
+    
+    rules = []
+    for position, rule in enumerate(config['rules']):
+        suggestion = {field: rule[field] for field in SUGGESTION_FIELDS if field in rule}
+        suggestion['keywords'] = tuple(str(keyword).lower() for keyword in suggestion.get('keywords', ()))
+        rules.append((-float(rule.get('priority', 0)), position, suggestion, _rule_matcher(rule)))
+    
+    # Highest priority first, then file order
+    rules.sort(key=lambda item: item[:2])
+    
+    candidates = {}
+    suggestions = {}
+    for day in _ALL_DAYS:
+        for weekday in range(7):
+            key = (day.month, day.day, weekday)
+            day_candidates = tuple(
+                (-negative_priority, suggestion)
+                for negative_priority, _, suggestion, matches in rules
+                if matches(day.month, day.day, weekday)
+            )
+            candidates[key] = day_candidates
+            suggestions[key] = tuple(suggestion for _, suggestion in day_candidates[:slots])
+    
+    return {'slots': slots, 'candidates': candidates, 'suggestions': suggestions}
+
+def load_rules(path=RULES_PATH):
+    """
+    Read and compile the suggestion rules file
+    
+    Args:
+        path (str): Path to the rules JSON file
+    
+    Returns:
+        dict: Compiled rules
+    """
+    with open(path, 'r') as f:
+        return compile_rules(json.load(f))
+
+# Compiled rules currently in use; replaced as a whole on reload
+_compiled = None
+_rules_mtime = None
+_watcher_lock = threading.Lock()
+_watcher_started = False
+
+def reload_rules():
+    """
+    Recompile the rules file if it changed since the last load
+    
+    A broken file keeps the previous rules in place.
+    
+    Returns:
+        bool: True if new rules were loaded
+    """
+    global _compiled, _rules_mtime
+    try:
+        mtime = os.stat(RULES_PATH).st_mtime_ns
+        if mtime == _rules_mtime:
+            return False
+        # Remember the version even if it fails, so a bad file is reported once
+        _rules_mtime = mtime
+        compiled = load_rules(RULES_PATH)
+    except Exception as e:
+        print(f"Error loading suggestion rules: {e}")
+        return False
+    
+    _compiled = compiled
+    return True
+
+def _watch_rules():
+    """Watcher thread - poll the rules file and hot-reload on change"""
+    while True:
+        time.sleep(RULES_POLL_SECONDS)
+        reload_rules()
+
+def _get_rules():
+    """
+    Get the compiled rules, loading them and starting the watcher on first use
+    
+    A missing or broken rules file falls back to DEFAULT_RULES; the watcher
+    swaps in the file's rules once it loads.
+    """
+    global _compiled, _watcher_started
+    if not _watcher_started:
+        with _watcher_lock:
+            if not _watcher_started:
+                if not reload_rules() and _compiled is None:
+                    print(f"Warning: using built-in suggestion rules until {RULES_PATH} can be loaded")
+                    _compiled = compile_rules(DEFAULT_RULES)
+                threading.Thread(target=_watch_rules, name="suggestion-rules-watcher", daemon=True).start()
+                _watcher_started = True
+    
+    return _compiled
+
+def _date_key(target_date):
+    """Lookup key for a date in the compiled tables"""
+    return target_date.month, target_date.day, target_date.weekday()
+
+def rank_suggestions(target_date, lead_aggregates, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Rank the day's candidate products by rule priority and demand in the lead book
+    
+    Args:
+        target_date (date): Day to rank suggestions for
+        lead_aggregates (LeadAggregates): Running counts over the lead book
+        thresholds (tuple): (warm, hot) minimum scores
+    
+    Returns:
+        list: Top suggestion dictionaries, best first
+    """
+    rules = _get_rules()
+    candidates = rules['candidates'][_date_key(target_date)]
+    
+    # Hot leads count double towards product demand
+    book_demand = 2 * lead_aggregates.status_total('Hot', thresholds) + lead_aggregates.status_total('Warm', thresholds)
+    
+    ranked = []
+    for position, (priority, suggestion) in enumerate(candidates):
+        summary = lead_aggregates.summarize_products(suggestion['keywords'], target_date, thresholds)
+        
+        score = priority
+        if book_demand:
+            score += LEAD_INTEREST_WEIGHT * (2 * summary['hot'] + summary['warm']) / book_demand
+        if summary['total']:
+            score += LEAD_RECENCY_WEIGHT * summary['recent'] / summary['total']
+        
+        # Ties keep the default rule order
+        ranked.append((-score, position, suggestion, summary))
+    
+    ranked.sort(key=lambda item: item[:2])
+    
+    suggestions = []
+    for _, _, suggestion, summary in ranked[:rules['slots']]:
+        if summary['hot'] or summary['warm']:
+            suggestion = dict(
+                suggestion,
+                reason=f"{suggestion['reason']} - {summary['hot']} hot and {summary['warm']} warm leads in your book are interested"
+            )
+        suggestions.append(suggestion)
+    
+    return suggestions
+
+def get_daily_suggestions(target_date=None, lead_aggregates=None, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Get the product suggestions for a day from the compiled rules
+    
+    Args:
+        target_date (date, optional): Day to get suggestions for, defaults to today
+        lead_aggregates (LeadAggregates, optional): When given, rank the day's
+            products by demand in the lead book instead of the rule order
+        thresholds (tuple): (warm, hot) minimum scores used to rank
+    
+    Returns:
+        list or tuple: Suggestion dictionaries (shared between calls, treat as read-only)
+    """
+    if target_date is None:
+        target_date = datetime.now().date()
+    
+    if lead_aggregates is not None and lead_aggregates.total:
+        return rank_suggestions(target_date, lead_aggregates, thresholds)
+    
+    return _get_rules()['suggestions'][_date_key(target_date)]
+
+def get_ranked_suggestions(state, target_date=None):
+    """
+    Get the day's suggestions ranked by the session's lead book, re-ranked
+    only when the day, the book, the thresholds or the rules change
+    
+    Args:
+        state: Streamlit session state
+        target_date (date, optional): Day to get suggestions for, defaults to today
+    
+    Returns:
+        list or tuple: Suggestion dictionaries (shared between calls, treat as read-only)
+    """
+    if target_date is None:
+        target_date = datetime.now().date()
+    
+    # Reloaded rules are a new object, so they invalidate the ranking too
+    rules = _get_rules()
+    thresholds = tuple(get_status_thresholds(state))
+    key = (target_date, state.leads_version, thresholds, id(rules))
+    cache = state.get('ranked_suggestions')
+    if cache is None or cache['key'] != key:
+        cache = {
+            'key': key,
+            'rules': rules,
+            'suggestions': get_daily_suggestions(target_date, state.lead_aggregates, thresholds),
         }
-    }
-    
-    # Seasonal suggestions
-    seasonal_suggestions = []
-    
-    # March-end financial year closing
-    if month == 3:
-        seasonal_suggestions.append({
-            "product": "Tax-saving ELSS Funds",
-            "reason": "Financial year ending - tax saving rush",
-            "approach": "Last chance for tax deductions this fiscal year",
-            "icon": "file-minus"
-        })
-    
-    # Festival season (October-November)
-    if month in [10, 11]:
-        seasonal_suggestions.append({
-            "product": "Gold Investment Plans",
-            "reason": "Festival season increases interest in gold",
-            "approach": "Digital gold as a modern alternative to physical gold",
-            "icon": "award"
-        })
-    
-    # Monsoon season (June-September)
-    if month in [6, 7, 8, 9]:
-        seasonal_suggestions.append({
-            "product": "Home Insurance",
-            "reason": "Weather-related incidents increase during monsoon",
-            "approach": "Protect against water damage and other monsoon risks",
-            "icon": "home"
-        })
-    
-    # Summer vacation season (April-May)
-    if month in [4, 5]:
-        seasonal_suggestions.append({
-            "product": "International Travel Insurance",
-            "reason": "Peak summer vacation planning season",
-            "approach": "Comprehensive coverage for foreign trips",
-            "icon": "globe"
-        })
-    
-    # Combine suggestions
-    all_suggestions = []
-    
-    # Add day-specific suggestion first
-    all_suggestions.append(day_specific[day_of_week])
-    
-    # Add seasonal suggestions if available
-    all_suggestions.extend(seasonal_suggestions)
-    
-    # Fill remaining spots with base suggestions
-    remaining_slots = 5 - len(all_suggestions)
-    all_suggestions.extend(base_suggestions[:remaining_slots])
-    
-    return all_suggestions[:5]  # Return at most 5 suggestions
+        state.ranked_suggestions = cache
+    return cache['suggestions']
+
+def get_suggestion_calendar(start_date=None, days=30):
+    """
+    Get the product suggestions for a range of days, e.g. for planning exports
+    
+    Args:
+        start_date (date, optional): First day of the range, defaults to today
+        days (int): Number of days in the range
+    
+    Yields:
+        tuple: (date, suggestions) for each day in the range
+    """
+    if start_date is None:
+        start_date = datetime.now().date()
+    suggestions = _get_rules()['suggestions']
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        yield day, suggestions[_date_key(day)]
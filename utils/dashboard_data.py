@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from utils.lead_aggregates import COUNTED_COLUMNS
+from utils.lead_scoring import DEFAULT_THRESHOLDS
+from utils.lead_bitmaps import filter_aggregates
+
+# Width of each bar in the score histogram (20 bins over 0-100)
+SCORE_BIN_WIDTH = 5
+
+def bin_score_counts(score_counts, bin_width=SCORE_BIN_WIDTH):
+    """
+    Group per-score counts into histogram bins
+
+    Args:
+        score_counts (np.ndarray): Number of leads for each score 0-100
+        bin_width (int): Scores per bin
+
+    Returns:
+        pd.DataFrame: Bin Start, Bin End and Count per bin; the last bin includes 100
+    """
+    bin_starts = np.arange(0, 100, bin_width)
+    counts = np.add.reduceat(score_counts[:100], bin_starts)
+    counts[-1] += score_counts[100]
+    return pd.DataFrame({'Bin Start': bin_starts, 'Bin End': np.minimum(bin_starts + bin_width, 100), 'Count': counts})
+
+def compute_dashboard_data(lead_aggregates, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Build the dashboard aggregates from the lead book's running counters
+
+    Args:
+        lead_aggregates (LeadAggregates): Running counts over the lead book
+        thresholds (tuple): (warm, hot) minimum scores for the Status counts
+
+    Returns:
+        dict: Lead total, per-column count tables, score histogram bins and the thresholds used
+    """
+    data = {'total': lead_aggregates.total, 'counts': {}, 'score_bins': None, 'thresholds': tuple(thresholds)}
+    if not lead_aggregates.total:
+        return data
+
+    for col in COUNTED_COLUMNS:
+        if col == 'Status':
+            # Statuses follow the thresholds, so they come from the score histogram
+            counts = {status: lead_aggregates.status_total(status, thresholds) for status in ['Hot', 'Warm', 'Cold']}
+            counts = {status: count for status, count in counts.items() if count}
+        else:
+            counts = lead_aggregates.column_counts[col]
+        if counts:
+            data['counts'][col] = (
+                pd.DataFrame(list(counts.items()), columns=[col, 'Count'])
+                .sort_values('Count', ascending=False, kind='stable')
+                .reset_index(drop=True)
+            )
+
+    if lead_aggregates.score_counts.any():
+        data['score_bins'] = bin_score_counts(lead_aggregates.score_counts)
+
+    return data
+
+def get_dashboard_data(state, filters=None):
+    """
+    Get the dashboard aggregates, rebuilding them only when the lead book, thresholds or filters change
+
+    Args:
+        state: Streamlit session state
+        filters (dict, optional): Column -> values to keep, answered from the bitmap indexes
+
+    Returns:
+        dict: Dashboard aggregates (see compute_dashboard_data) plus the filters applied
+    """
+    thresholds = tuple(state.get('status_thresholds', DEFAULT_THRESHOLDS))
+    filters = {col: tuple(values) for col, values in (filters or {}).items() if values}
+    cache = state.get('dashboard_data')
+    if (cache is None or cache['version'] != state.leads_version
+            or cache['data']['thresholds'] != thresholds or cache['data']['filters'] != filters):
+        aggregates = filter_aggregates(state, filters, thresholds) if filters else state.lead_aggregates
+        data = compute_dashboard_data(aggregates, thresholds)
+        data['filters'] = filters
+        cache = {'version': state.leads_version, 'data': data}
+        state.dashboard_data = cache
+    return cache['data']
@@ -0,0 +1,222 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+import pandas as pd
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+# SQLite file holding every interaction event and the daily rollups
+EVENT_LOG_PATH = os.environ.get(
+    'EVENT_LOG_PATH',
+    os.path.join(os.path.expanduser('~'), '.cache', 'gromo-sales-coach', 'events.db')
+)
+
+# The writer flushes whenever this many events are buffered...
+FLUSH_BATCH_SIZE = 200
+
+# ...or this many seconds after the first buffered event
+FLUSH_INTERVAL_SECONDS = 2
+
+# Rollup reads are reused for this long across sessions
+ROLLUP_CACHE_SECONDS = 5
+
+# Event types
+COACH_QUERY = 'coach_query'
+SUGGESTION_CLICK = 'suggestion_click'
+LEAD_UPLOAD = 'lead_upload'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    ts REAL NOT NULL,
+    session TEXT,
+    type TEXT NOT NULL,
+    name TEXT,
+    rows INTEGER,
+    duration_ms REAL
+);
+CREATE TABLE IF NOT EXISTS event_rollup (
+    day TEXT NOT NULL,
+    type TEXT NOT NULL,
+    events INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    duration_ms REAL NOT NULL,
+    PRIMARY KEY (day, type)
+);
+"""
+
+# Buffered events waiting for the writer; None asks it to stop
+_buffer = queue.SimpleQueue()
+_writer = None
+_writer_lock = threading.Lock()
+
+# Set when the database can't be opened; events are then dropped rather than buffered forever
+_writer_failed = threading.Event()
+
+# Last rollup read: (read at, days, DataFrame)
+_rollup_cache = None
+_rollup_lock = threading.Lock()
+
+def _connect():
+    """Open the event database, creating it on first use"""
+    os.makedirs(os.path.dirname(EVENT_LOG_PATH), exist_ok=True)
+    connection = sqlite3.connect(EVENT_LOG_PATH, timeout=5)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+def _write_batch(connection, events):
+    """Append a batch of events and fold it into the daily rollups in one transaction"""
+    rollup = defaultdict(lambda: [0, 0, 0.0])
+    for ts, _, event_type, _, rows, duration_ms in events:
+        totals = rollup[(date.fromtimestamp(ts).isoformat(), event_type)]
+        totals[0] += 1
+        totals[1] += rows or 0
+        totals[2] += duration_ms or 0.0
+
+    with connection:
+        connection.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)", events)
+        connection.executemany(
+            """
+            INSERT INTO event_rollup VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(day, type) DO UPDATE SET
+                events = events + excluded.events,
+                rows = rows + excluded.rows,
+                duration_ms = duration_ms + excluded.duration_ms
+            """,
+            [(day, event_type, *totals) for (day, event_type), totals in rollup.items()]
+        )
+
+def _run_writer():
+    """Writer thread - drain the buffer into SQLite in batches"""
+    try:
+        connection = _connect()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error opening event log, interaction events will not be recorded: {e}")
+        _writer_failed.set()
+        # Drop whatever was buffered before the failure was noticed
+        while True:
+            try:
+                _buffer.get_nowait()
+            except queue.Empty:
+                return
+
+    stopping = False
+    while not stopping:
+        event = _buffer.get()
+        if event is None:
+            break
+
+        # Gather more events until the batch is full or the interval is up
+        batch = [event]
+        deadline = time.monotonic() + FLUSH_INTERVAL_SECONDS
+        while len(batch) < FLUSH_BATCH_SIZE:
+            try:
+                event = _buffer.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if event is None:
+                stopping = True
+                break
+            batch.append(event)
+
+        try:
+            _write_batch(connection, batch)
+        except sqlite3.Error as e:
+            print(f"Error writing event log: {e}")
+
+    connection.close()
+
+def _stop_writer():
+    """Flush buffered events on interpreter exit"""
+    if _writer is not None and _writer.is_alive():
+        _buffer.put(None)
+        _writer.join(timeout=FLUSH_INTERVAL_SECONDS + 1)
+
+def log_event(event_type, session_id=None, name=None, rows=None, duration=None):
+    """
+    Record an interaction without waiting on disk
+
+    The event is buffered in memory and written by a background thread.
+    If the event database can't be opened, events are dropped.
+
+    Args:
+        event_type (str): COACH_QUERY, SUGGESTION_CLICK or LEAD_UPLOAD
+        session_id (str, optional): Session that produced the event
+        name (str, optional): Detail such as the product or file name
+        rows (int, optional): Number of leads involved
+        duration (float, optional): Time taken in seconds
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_run_writer, name="event-log-writer", daemon=True)
+                _writer.start()
+                atexit.register(_stop_writer)
+
+    if _writer_failed.is_set():
+        return
+
+    _buffer.put((
+        time.time(),
+        session_id,
+        event_type,
+        name,
+        rows,
+        duration * 1000 if duration is not None else None,
+    ))
+
+def get_event_rollup(days=7):
+    """
+    Get daily event counts across all sessions
+
+    Args:
+        days (int): Number of days to include, ending today
+
+    Returns:
+        pd.DataFrame: Day, Event, Count, Rows and Avg Duration (ms)
+    """
+    global _rollup_cache
+    with _rollup_lock:
+        if _rollup_cache is not None and _rollup_cache[1] == days and time.monotonic() - _rollup_cache[0] < ROLLUP_CACHE_SECONDS:
+            return _rollup_cache[2]
+
+    since = (datetime.today() - timedelta(days=days - 1)).date().isoformat()
+    try:
+        connection = sqlite3.connect(f"file:{EVENT_LOG_PATH}?mode=ro", uri=True, timeout=1)
+        try:
+            rows = connection.execute(
+                "SELECT day, type, events, rows, duration_ms FROM event_rollup WHERE day >= ? ORDER BY day DESC, type",
+                (since,)
+            ).fetchall()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        # Nothing logged yet
+        rows = []
+
+    rollup = pd.DataFrame(rows, columns=['Day', 'Event', 'Count', 'Rows', 'Duration (ms)'])
+    rollup['Avg Duration (ms)'] = (rollup['Duration (ms)'] / rollup['Count']).round(1)
+    rollup = rollup.drop(columns='Duration (ms)')
+
+    with _rollup_lock:
+        _rollup_cache = (time.monotonic(), days, rollup)
+    return rollup
+
+def get_event_count(event_type):
+    """
+    Count today's events of one type across all sessions
+
+    Args:
+        event_type (str): Event type
+
+    Returns:
+        int: Number of events
+    """
+    day = date.today().isoformat()
+    rollup = get_event_rollup()
+    matches = rollup[(rollup['Day'] == day) & (rollup['Event'] == event_type)]
+    return int(matches['Count'].sum())
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from utils.lead_scoring import DEFAULT_THRESHOLDS
+
+# Contacts within this many days count as recent
+RECENT_CONTACT_DAYS = 30
+
+# Columns with a maintained histogram of lead counts per value
+COUNTED_COLUMNS = ['Status', 'Lead Source', 'Product Interest', 'Location']
+
+# Scores are whole numbers from 0 to 100, so one bin per possible score
+SCORE_BINS = 101
+
+class LeadAggregates:
+    """
+    Running counts over the lead book, updated with deltas as leads change
+
+    Only the added, removed or rescored rows are grouped, so readers never
+    have to recount the full DataFrame.
+    """
+
+    def __init__(self):
+        self.total = 0
+        # column -> {value: number of leads}
+        self.column_counts = {col: Counter() for col in COUNTED_COLUMNS}
+        # score -> number of leads
+        self.score_counts = np.zeros(SCORE_BINS, dtype=np.int64)
+        # (product interest, score) -> number of leads, so statuses follow any thresholds
+        self.product_scores = Counter()
+        # product interest -> {last contact day: number of leads}
+        self.product_contacts = defaultdict(Counter)
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build aggregates for a whole lead book
+
+        Args:
+            df (pd.DataFrame): Scored leads
+
+        Returns:
+            LeadAggregates: Aggregates covering every row of df
+        """
+        aggregates = cls()
+        aggregates.add(df)
+        return aggregates
+
+    def copy(self):
+        """
+        Copy the counts, e.g. to start a session's own aggregates from a shared book
+
+        Returns:
+            LeadAggregates: Independent copy
+        """
+        aggregates = LeadAggregates()
+        aggregates.total = self.total
+        aggregates.column_counts = {col: Counter(counts) for col, counts in self.column_counts.items()}
+        aggregates.score_counts = self.score_counts.copy()
+        aggregates.product_scores = Counter(self.product_scores)
+        aggregates.product_contacts = defaultdict(Counter, {
+            product: Counter(contacts) for product, contacts in self.product_contacts.items()
+        })
+        return aggregates
+
+    def add(self, df):
+        """
+        Add a batch of scored leads to the running counts
+
+        Args:
+            df (pd.DataFrame): Newly added scored leads
+        """
+        self._apply(df, 1)
+
+    def remove(self, df):
+        """
+        Remove a batch of scored leads from the running counts
+
+        Args:
+            df (pd.DataFrame): Leads being removed, as they were counted
+        """
+        self._apply(df, -1)
+
+    def _apply(self, df, sign):
+        """Add (sign=1) or subtract (sign=-1) a batch of leads"""
+        if df.empty:
+            return
+
+        for col in COUNTED_COLUMNS:
+            if col in df.columns:
+                _update_counter(self.column_counts[col], df[col].value_counts().items(), sign)
+
+        products = self._products(df)
+        if 'Score' in df.columns:
+            scores = _score_bins(df['Score'])
+            self.score_counts += sign * np.bincount(scores, minlength=SCORE_BINS)
+            _update_counter(self.product_scores, df.groupby([products, scores]).size().items(), sign)
+
+        if 'Last Contact Date' in df.columns:
+            contact_days = pd.to_datetime(df['Last Contact Date'], errors='coerce').dt.normalize()
+            for (product, day), count in df.groupby([products, contact_days]).size().items():
+                _update_counter(self.product_contacts[product], [(day, count)], sign)
+                if not self.product_contacts[product]:
+                    del self.product_contacts[product]
+
+        self.total += sign * len(df)
+
+    @staticmethod
+    def _products(df):
+        """Normalized Product Interest values used as aggregate keys"""
+        if 'Product Interest' not in df.columns:
+            return pd.Series('unknown', index=df.index)
+        return df['Product Interest'].fillna('unknown').astype(str).str.strip().str.lower()
+
+    def count(self, column, value):
+        """
+        Count leads with a value in one of the counted columns
+
+        Args:
+            column (str): One of COUNTED_COLUMNS
+            value: Column value
+
+        Returns:
+            int: Number of leads
+        """
+        return self.column_counts[column].get(value, 0)
+
+    def status_total(self, status, thresholds=DEFAULT_THRESHOLDS):
+        """
+        Count leads with a status across all products
+
+        Args:
+            status (str): Lead status
+            thresholds (tuple): (warm, hot) minimum scores
+
+        Returns:
+            int: Number of leads
+        """
+        return count_status(self.score_counts, status, thresholds)
+
+    def summarize_products(self, keywords, today=None, thresholds=DEFAULT_THRESHOLDS):
+        """
+        Summarize leads whose Product Interest contains any of the keywords
+
+        Args:
+            keywords (tuple): Lowercase product keywords
+            today (datetime, optional): Reference day for recency, defaults to today
+            thresholds (tuple): (warm, hot) minimum scores
+
+        Returns:
+            dict: Hot, Warm, total and recently contacted lead counts
+        """
+        if today is None:
+            today = datetime.today()
+        recent_since = pd.Timestamp(today).normalize() - timedelta(days=RECENT_CONTACT_DAYS)
+
+        summary = {'hot': 0, 'warm': 0, 'total': 0, 'recent': 0}
+        warm, hot = thresholds
+        for (product, score), count in self.product_scores.items():
+            if not any(keyword in product for keyword in keywords):
+                continue
+            summary['total'] += count
+            if score >= hot:
+                summary['hot'] += count
+            elif score >= warm:
+                summary['warm'] += count
+
+        for product, contacts in self.product_contacts.items():
+            if any(keyword in product for keyword in keywords):
+                summary['recent'] += sum(count for day, count in contacts.items() if day >= recent_since)
+
+        return summary
+
+def _score_bins(scores):
+    """Whole-number scores clipped to the histogram's bins"""
+    return pd.to_numeric(scores, errors='coerce').fillna(0).astype(int).clip(0, SCORE_BINS - 1)
+
+def score_histogram(scores):
+    """
+    Count leads per score, e.g. to count a batch's statuses under any thresholds
+
+    Args:
+        scores (pd.Series): Lead scores
+
+    Returns:
+        np.ndarray: Number of leads per score, SCORE_BINS long
+    """
+    return np.bincount(_score_bins(scores), minlength=SCORE_BINS)
+
+def count_status(score_counts, status, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Count leads with a status from a score histogram
+
+    Args:
+        score_counts (np.ndarray): Number of leads per score
+        status (str): Lead status
+        thresholds (tuple): (warm, hot) minimum scores
+
+    Returns:
+        int: Number of leads
+    """
+    warm, hot = thresholds
+    bounds = {'Cold': (0, warm), 'Warm': (warm, hot), 'Hot': (hot, SCORE_BINS)}[status]
+    return int(score_counts[max(0, bounds[0]):max(0, bounds[1])].sum())
+
+def _update_counter(counter, items, sign):
+    """Apply (key, count) deltas to a Counter, dropping keys that reach zero"""
+    for key, count in items:
+        counter[key] += sign * int(count)
+        if counter[key] <= 0:
+            del counter[key]
@@ -0,0 +1,109 @@
+import io
+import os
+import time
+import zipfile
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from utils.lead_book import (
+    get_leads, get_book_hashes, get_dataset_key,
+    open_shared_leads, score_lead_frame, merge_scored_files
+)
+
+# Files parsed and scored at once. Threads rather than processes, because
+# Location codes index this process's city table.
+UPLOAD_WORKERS = min(8, os.cpu_count() or 1)
+
+def expand_uploads(files):
+    """
+    Unpack zip archives into the CSV files they contain
+
+    Args:
+        files (list): (file name, raw bytes) per uploaded file
+
+    Returns:
+        tuple: ((name, bytes) per CSV, (name, error message) per unreadable archive)
+    """
+    csv_files, errors = [], []
+    for name, content in files:
+        if not name.lower().endswith('.zip'):
+            csv_files.append((name, content))
+            continue
+
+        try:
+            with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                for member in archive.infolist():
+                    member_name = os.path.basename(member.filename)
+                    # Skip folders and the metadata macOS adds to archives
+                    if member.is_dir() or not member_name.lower().endswith('.csv') or member.filename.startswith('__MACOSX/'):
+                        continue
+                    csv_files.append((f"{name}/{member.filename}", archive.read(member)))
+        except (zipfile.BadZipFile, OSError) as e:
+            errors.append((name, f"Could not open archive: {e}"))
+
+    return csv_files, errors
+
+def _score_file(name, content, old_df, book_hashes):
+    """Parse and score one CSV; failures are reported rather than raised"""
+    start = time.perf_counter()
+    try:
+        df = pd.read_csv(io.BytesIO(content))
+        is_valid, message, scored_df, row_hashes, reused_labels = score_lead_frame(df, old_df, book_hashes)
+    except Exception as e:
+        is_valid, message, scored_df, row_hashes, reused_labels = False, f"Error reading file: {e}", None, None, None
+
+    return {
+        'name': name,
+        'is_valid': is_valid,
+        'message': message if not is_valid else "",
+        'rows': len(scored_df) if is_valid else 0,
+        'seconds': time.perf_counter() - start,
+        'result': (scored_df, row_hashes, reused_labels) if is_valid else None,
+    }
+
+def load_lead_batch(state, files, incremental=True, max_workers=UPLOAD_WORKERS):
+    """
+    Score several uploaded CSV or zip files concurrently into the lead book
+
+    Each file is parsed, validated and scored on its own, so one bad file
+    doesn't block the others; the valid files replace the book, in upload order.
+
+    Args:
+        state: Streamlit session state
+        files (list): (file name, raw bytes) per uploaded file
+        incremental (bool): Keep book leads whose raw rows are unchanged instead of rescoring them
+        max_workers (int): Files scored at once
+
+    Returns:
+        tuple: (per-file results, change counts or None). Each result has name,
+            is_valid, message, rows and seconds.
+    """
+    csv_files, errors = expand_uploads(files)
+    failed = [
+        {'name': name, 'is_valid': False, 'message': message, 'rows': 0, 'seconds': 0.0, 'result': None}
+        for name, message in errors
+    ]
+    if not csv_files:
+        return failed, None
+
+    # The same set of files scored today by any session is shared
+    key = get_dataset_key(b''.join(content for _, content in csv_files))
+    shared_df = open_shared_leads(state, key, keep_added=True)
+    if shared_df is not None:
+        shared = {'name': ', '.join(name for name, _ in csv_files), 'is_valid': True, 'message': "Opened a teammate's copy",
+                  'rows': len(shared_df), 'seconds': 0.0, 'result': None}
+        return [shared] + failed, None
+
+    old_df = get_leads(state)
+    book_hashes = get_book_hashes(state) if incremental else None
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lead-upload") as pool:
+        results = list(pool.map(lambda file: _score_file(*file, old_df, book_hashes), csv_files))
+
+    scored = [result['result'] for result in results if result['is_valid']]
+    changes = None
+    if scored:
+        name = csv_files[0][0] if len(csv_files) == 1 else f"{csv_files[0][0]} + {len(csv_files) - 1} more"
+        changes = merge_scored_files(state, scored, key=key, name=name)
+
+    for result in results:
+        result['result'] = None
+    return results + failed, changes
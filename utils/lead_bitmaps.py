@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+from utils.lead_aggregates import LeadAggregates, SCORE_BINS
+from utils.lead_scoring import DEFAULT_THRESHOLDS, get_status
+
+# Low-cardinality columns with a bitmap per value; Status follows from Score
+BITMAP_COLUMNS = ['Lead Source', 'Product Interest', 'Location', 'Score']
+
+# Columns leads can be filtered by, in widget order
+FILTER_COLUMNS = ['Status', 'Lead Source', 'Product Interest', 'Location']
+
+STATUSES = ['Hot', 'Warm', 'Cold']
+
+def _pack_groups(codes, uniques, rows):
+    """
+    Packed bits of the rows holding each value, from one pass over the codes
+
+    Rows are grouped by code with one stable sort, so each value's bits are
+    set from its own slice of row positions rather than a scan of every row.
+
+    Args:
+        codes (np.ndarray): Value code per row, -1 for missing
+        uniques (array-like): Value per code
+        rows (int): Number of rows
+
+    Returns:
+        dict: Value -> packed bits, for values present in at least one row
+    """
+    codes = np.asarray(codes)
+    positions = np.argsort(codes, kind='stable')
+    # Missing values sort first and aren't indexed
+    positions = positions[np.count_nonzero(codes < 0):]
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    ends = np.cumsum(counts)
+
+    packed_length = (rows + 7) // 8
+    bitmaps = {}
+    for code in np.flatnonzero(counts):
+        group = positions[ends[code] - counts[code]:ends[code]]
+        bits = np.zeros(packed_length, dtype=np.uint8)
+        # Bit order matches np.packbits: the first row is the high bit of byte 0
+        np.bitwise_or.at(bits, group >> 3, (np.uint8(0x80) >> (group & 7).astype(np.uint8)))
+        bitmaps[uniques[code]] = bits
+    return bitmaps
+
+class BitmapIndex:
+    """
+    One packed bitset per value of the low-cardinality lead columns
+
+    Bit i stands for the i-th row of the indexed DataFrame, so a multi-column
+    filter is an AND of per-column ORs and its counts are popcounts; no
+    boolean masks are built over the DataFrame.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pd.DataFrame): Leads to index
+        """
+        self.labels = df.index
+        self.all_bits = np.packbits(np.ones(len(df), dtype=bool))
+        # column -> {value: packed bits}
+        self.bitmaps = {}
+        for col in BITMAP_COLUMNS:
+            if col not in df.columns:
+                continue
+            values = df[col]
+            if col == 'Score':
+                values = pd.to_numeric(values, errors='coerce').fillna(0).astype(int).clip(0, SCORE_BINS - 1)
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, uniques = pd.factorize(values)
+            self.bitmaps[col] = _pack_groups(codes, uniques, len(df))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _any_of(self, col, values):
+        """Bits of rows whose column holds any of the values"""
+        bits = np.zeros_like(self.all_bits)
+        for value in values:
+            value_bits = self.bitmaps.get(col, {}).get(value)
+            if value_bits is not None:
+                bits |= value_bits
+        return bits
+
+    def match(self, filters, thresholds=DEFAULT_THRESHOLDS):
+        """
+        Bits of the rows passing every filter
+
+        Args:
+            filters (dict): Column -> values to keep; Status is matched through Score
+            thresholds (tuple): (warm, hot) minimum scores
+
+        Returns:
+            np.ndarray: Packed bits
+        """
+        bits = self.all_bits.copy()
+        for col, values in filters.items():
+            if not values:
+                continue
+            if col == 'Status':
+                # Statuses are the scores in their threshold ranges
+                scores = list(self.bitmaps.get('Score', {}))
+                col, values = 'Score', [score for score, status in zip(scores, get_status(scores, *thresholds)) if status in values]
+            bits &= self._any_of(col, values)
+        return bits
+
+    def positions(self, bits):
+        """Row positions of the set bits"""
+        return np.flatnonzero(np.unpackbits(bits, count=len(self)))
+
+    def aggregate(self, bits):
+        """
+        Count the selected rows the way LeadAggregates does, for the dashboard
+
+        Args:
+            bits (np.ndarray): Packed bits of the selected rows
+
+        Returns:
+            LeadAggregates: Total, column counts and score histogram of the selection
+        """
+        aggregates = LeadAggregates()
+        aggregates.total = int(np.bitwise_count(bits).sum())
+        for col, bitmaps in self.bitmaps.items():
+            for value, value_bits in bitmaps.items():
+                count = int(np.bitwise_count(bits & value_bits).sum())
+                if not count:
+                    continue
+                if col == 'Score':
+                    aggregates.score_counts[value] += count
+                else:
+                    aggregates.column_counts[col][value] += count
+        return aggregates
+
+def _merge_aggregates(parts):
+    """Add up LeadAggregates from several segments"""
+    aggregates = LeadAggregates()
+    for part in parts:
+        aggregates.total += part.total
+        aggregates.score_counts += part.score_counts
+        for col, counts in part.column_counts.items():
+            aggregates.column_counts[col].update(counts)
+    return aggregates
+
+def get_bitmap_segments(state):
+    """
+    Get the bitmap indexes for the session's lead book
+
+    The shared base dataset is indexed once for every session using it; the
+    session's added leads are indexed whenever they change. Each segment
+    comes with the bits of its rows still in the book.
+
+    Args:
+        state: Streamlit session state
+
+    Returns:
+        list: (BitmapIndex, packed bits of live rows) per segment
+    """
+    cache = state.get('lead_bitmaps')
+    if cache is not None and cache['version'] == state.leads_version:
+        return cache['segments']
+
+    overlay = state.lead_overlay
+    segments = []
+    if state.lead_base is not None:
+        base = state.lead_base.get_derived('bitmap_index', BitmapIndex)
+        live = base.all_bits.copy()
+        if overlay['removed']:
+            # Base rows are labelled by position
+            removed = np.zeros(len(base), dtype=bool)
+            removed[list(overlay['removed'])] = True
+            live &= ~np.packbits(removed)
+        segments.append((base, live))
+
+    added = overlay['added']
+    if not added.empty:
+        # Reuse the previous index while the added leads are unchanged
+        if cache is not None and cache['added'] is added:
+            segments.append(cache['segments'][-1])
+        else:
+            index = BitmapIndex(added)
+            segments.append((index, index.all_bits))
+
+    state.lead_bitmaps = {'version': state.leads_version, 'added': added, 'segments': segments}
+    return segments
+
+def get_filter_options(state):
+    """
+    Get the values each filter can offer for the session's lead book
+
+    Args:
+        state: Streamlit session state
+
+    Returns:
+        dict: Column -> sorted values, for FILTER_COLUMNS
+    """
+    options = {'Status': STATUSES}
+    for col in FILTER_COLUMNS[1:]:
+        values = set()
+        for index, _ in get_bitmap_segments(state):
+            values.update(index.bitmaps.get(col, {}))
+        options[col] = sorted(values, key=str)
+    return options
+
+def filter_leads(state, filters, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Find the leads passing every filter
+
+    Args:
+        state: Streamlit session state
+        filters (dict): Column -> values to keep, empty for no filter
+        thresholds (tuple): (warm, hot) minimum scores
+
+    Returns:
+        pd.Index: Row labels of the matching leads, in book order
+    """
+    labels = [
+        index.labels[index.positions(index.match(filters, thresholds) & live)]
+        for index, live in get_bitmap_segments(state)
+    ]
+    return labels[0].append(labels[1:]) if labels else pd.Index([], dtype='int64')
+
+def filter_aggregates(state, filters, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Count the leads passing every filter, by column value and score
+
+    Args:
+        state: Streamlit session state
+        filters (dict): Column -> values to keep, empty for no filter
+        thresholds (tuple): (warm, hot) minimum scores
+
+    Returns:
+        LeadAggregates: Counts of the matching leads (no per-product detail)
+    """
+    return _merge_aggregates([
+        index.aggregate(index.match(filters, thresholds) & live)
+        for index, live in get_bitmap_segments(state)
+    ])
@@ -0,0 +1,416 @@
+import hashlib
+import uuid
+import numpy as np
+import pandas as pd
+from datetime import date
+from utils.lead_scoring import score_leads, validate_lead_data, preprocess_lead_data
+from utils.lead_aggregates import LeadAggregates
+from utils.locations import align_locations
+from utils.shared_datasets import acquire_dataset
+
+# Columns of the session lead book
+LEAD_COLUMNS = [
+    'Name', 'Contact', 'Location', 'Product Interest',
+    'Last Contact Date', 'Lead Source', 'Score', 'Status'
+]
+
+# Column that identifies a lead across uploads, so an edited row counts as changed rather than new
+LEAD_IDENTITY_COLUMN = 'Contact'
+
+# The lead book is a shared, read-only base dataset (state.lead_base) plus a
+# per-session overlay of added rows and removed base rows (state.lead_overlay).
+# Base rows are labelled 0..n-1 and added rows continue from n, so a row keeps
+# its label for as long as it stays in the book.
+
+def _empty_overlay(next_label=0):
+    """Overlay with no session edits"""
+    return {
+        'added': pd.DataFrame(columns=LEAD_COLUMNS),
+        'removed': frozenset(),
+        'next_label': next_label,
+    }
+
+def init_lead_book(state):
+    """
+    Initialize the lead book in session state
+
+    Args:
+        state: Streamlit session state
+    """
+    if 'lead_base' not in state:
+        state.lead_base = None
+
+    if 'lead_overlay' not in state:
+        state.lead_overlay = _empty_overlay()
+
+    if 'lead_aggregates' not in state:
+        state.lead_aggregates = LeadAggregates()
+
+    # Bumped on every change so derived data can be cached per version
+    if 'leads_version' not in state:
+        state.leads_version = 0
+
+def _concat_leads(parts):
+    """Concatenate lead frames, keeping Location as codes over one city table"""
+    if all('Location' in part.columns for part in parts):
+        parts = [part.assign(Location=align_locations(part['Location'])) for part in parts]
+    return pd.concat(parts)
+
+def get_leads(state):
+    """
+    Get the session's view of the lead book
+
+    With no session edits this is the shared base DataFrame itself, so it must
+    not be modified in place; otherwise the base and overlay are merged.
+
+    Args:
+        state: Streamlit session state
+
+    Returns:
+        pd.DataFrame: Leads, labelled as described above
+    """
+    overlay = state.lead_overlay
+    if state.lead_base is None:
+        return overlay['added']
+
+    base_df = state.lead_base.df
+    if not overlay['removed'] and overlay['added'].empty:
+        return base_df
+
+    parts = [base_df.drop(index=list(overlay['removed'])) if overlay['removed'] else base_df]
+    if not overlay['added'].empty:
+        parts.append(overlay['added'])
+    return _concat_leads(parts)
+
+def get_dataset_key(content):
+    """
+    Key a shared dataset by file content and scoring day
+
+    Scores depend on contact recency, so the same file scored on another day
+    is a different dataset.
+
+    Args:
+        content (bytes): Raw uploaded file
+
+    Returns:
+        str: Dataset key
+    """
+    return f"{hashlib.sha1(content).hexdigest()}:{date.today().isoformat()}"
+
+def hash_lead_rows(df):
+    """
+    Hash each raw uploaded row's content
+
+    Non-text columns are hashed as text, so a value hashes the same whichever
+    type read_csv infers for its column.
+
+    Args:
+        df (pd.DataFrame): Leads as read from the CSV
+
+    Returns:
+        np.ndarray: uint64 hash per row
+    """
+    as_text = df.astype({col: str for col in df.columns if df[col].dtype != object})
+    return pd.util.hash_pandas_object(as_text, index=False).to_numpy()
+
+def _set_base(state, handle):
+    """Swap the session's base dataset, releasing the previous one"""
+    if state.lead_base is not None:
+        state.lead_base.release()
+    state.lead_base = handle
+
+def _hand_entered_leads(state, uploaded):
+    """
+    Leads added to the session by hand that an upload doesn't replace
+
+    Added leads never come from a file, so they'd be lost when an upload
+    replaces the book; those whose identity isn't in the upload are kept.
+
+    Args:
+        state: Streamlit session state
+        uploaded (list): DataFrames of the uploaded leads
+
+    Returns:
+        pd.DataFrame: Added leads to carry into the new book
+    """
+    added = state.lead_overlay['added']
+    identity = LEAD_IDENTITY_COLUMN
+    if added.empty or identity not in added.columns:
+        return added
+    uploaded_ids = pd.concat([df[identity] for df in uploaded if identity in df.columns] or [pd.Series(dtype=object)])
+    added_ids = added[identity].astype(str).str.strip()
+    return added[~added_ids.isin(uploaded_ids.astype(str).str.strip())]
+
+def open_shared_leads(state, key, keep_added=False):
+    """
+    Open a dataset already loaded by another session as the lead book
+
+    Args:
+        state: Streamlit session state
+        key (str): Dataset key
+        keep_added (bool): Carry over leads added by hand that aren't in the dataset,
+            as when the same file is uploaded again
+
+    Returns:
+        pd.DataFrame: The shared scored leads, or None if no session has the dataset loaded
+    """
+    handle = acquire_dataset(key)
+    if handle is None:
+        return None
+    kept_df = _hand_entered_leads(state, [handle.df]) if keep_added else None
+    _set_base(state, handle)
+    state.lead_overlay = _empty_overlay(len(state.lead_base.df))
+    state.lead_aggregates = state.lead_base.aggregates.copy()
+    state.leads_version += 1
+    if kept_df is not None and not kept_df.empty:
+        append_leads(state, kept_df)
+    return state.lead_base.df
+
+def replace_leads(state, scored_df, key=None, name=None, row_hashes=None, aggregates=None):
+    """
+    Replace the lead book with a newly scored set of leads
+
+    Args:
+        state: Streamlit session state
+        scored_df (pd.DataFrame): Scored leads
+        key (str, optional): Shared dataset key; a private key is used when None
+        name (str, optional): Display name for the dataset
+        row_hashes (np.ndarray, optional): Raw row hashes (see hash_lead_rows), in scored_df's order
+        aggregates (LeadAggregates, optional): Counts over scored_df, if already known
+    """
+    if key is None:
+        key = f"private:{uuid.uuid4().hex}"
+
+    handle = acquire_dataset(
+        key,
+        build=lambda: scored_df.reset_index(drop=True),
+        name=name,
+        row_hashes=row_hashes,
+        aggregates=aggregates
+    )
+    _set_base(state, handle)
+    state.lead_overlay = _empty_overlay(len(handle.df))
+    state.lead_aggregates = handle.aggregates.copy()
+    state.leads_version += 1
+
+def get_book_hashes(state):
+    """
+    Get the raw row hash of each uploaded lead still in the book
+
+    Args:
+        state: Streamlit session state
+
+    Returns:
+        pd.Series: Book label per distinct row hash's first lead, or None if the book has no hashes
+    """
+    base = state.lead_base
+    if base is None or base.row_hashes is None:
+        return None
+
+    hashes = pd.Series(base.row_hashes, index=base.df.index)
+    if state.lead_overlay['removed']:
+        hashes = hashes.drop(index=list(state.lead_overlay['removed']))
+    return hashes[~hashes.duplicated()]
+
+def score_lead_frame(df, old_df=None, book_hashes=None):
+    """
+    Validate, preprocess and score leads read from one file, reusing unchanged leads
+
+    Rows whose content hash matches a book lead keep that lead as it is,
+    score included; only the rest are validated, preprocessed and scored.
+    The book is only read, so several files can be scored at once.
+
+    Args:
+        df (pd.DataFrame): Leads as read from the CSV
+        old_df (pd.DataFrame, optional): The current lead book
+        book_hashes (pd.Series, optional): See get_book_hashes; every row is scored when None
+
+    Returns:
+        tuple: (is_valid, message, scored DataFrame in file order or None, row hashes,
+            reused book labels indexed by file row)
+    """
+    row_hashes = hash_lead_rows(df)
+    if book_hashes is None or old_df is None:
+        book_hashes = pd.Series([], dtype='uint64', index=pd.Index([], dtype='int64'))
+    positions = pd.Index(book_hashes.to_numpy()).get_indexer(row_hashes)
+    unchanged = positions >= 0
+
+    fresh_df = df[~unchanged]
+    # Rows already in the book were validated when first uploaded
+    is_valid, message = validate_lead_data(fresh_df if not fresh_df.empty else df.iloc[:1])
+    if not is_valid:
+        return is_valid, message, None, row_hashes, None
+
+    reused_labels = pd.Series(book_hashes.index[positions[unchanged]], index=np.flatnonzero(unchanged))
+    parts = []
+    if unchanged.any():
+        parts.append(old_df.loc[reused_labels.to_numpy()].set_axis(reused_labels.index))
+    if not fresh_df.empty:
+        parts.append(score_leads(preprocess_lead_data(fresh_df)).set_axis(np.flatnonzero(~unchanged)))
+    scored_df = _concat_leads(parts).sort_index() if len(parts) > 1 else parts[0]
+    return is_valid, message, scored_df.set_axis(pd.RangeIndex(len(scored_df))), row_hashes, reused_labels
+
+def merge_scored_files(state, results, key=None, name=None):
+    """
+    Replace the lead book with one or more scored files, in order
+
+    The running counts move by the difference from the old book rather than
+    being recounted. Leads added by hand stay in the book unless a file has
+    a lead with the same identity.
+
+    Args:
+        state: Streamlit session state
+        results (list): (scored DataFrame, row hashes, reused labels) per file, from score_lead_frame
+        key (str, optional): Shared dataset key, only used if no book leads were reused
+        name (str, optional): Display name for the dataset
+
+    Returns:
+        dict: Number of inserted, changed, unchanged, removed and kept hand-entered leads
+    """
+    old_df = get_leads(state)
+    kept_df = _hand_entered_leads(state, [scored_df for scored_df, _, _ in results])
+    parts, reused, fresh = [], [], []
+    offset = 0
+    for scored_df, _, reused_labels in results:
+        parts.append(scored_df.set_axis(pd.RangeIndex(offset, offset + len(scored_df))))
+        reused.append(reused_labels)
+        fresh.append(scored_df.drop(index=reused_labels.index))
+        offset += len(scored_df)
+
+    reused_labels = pd.concat(reused)
+    fresh_df = _concat_leads(fresh) if len(fresh) > 1 else fresh[0]
+    dropped_df = old_df.drop(index=pd.Index(reused_labels.unique()).union(kept_df.index))
+
+    if reused_labels.empty:
+        # Nothing carried over, so the scores are all today's and the book can be shared
+        aggregates = None
+    else:
+        key = None
+        aggregates = state.lead_aggregates.copy()
+        aggregates.remove(dropped_df)
+        # Kept leads go back in the overlay, which counts them again
+        aggregates.remove(kept_df)
+        aggregates.add(old_df.loc[reused_labels[reused_labels.duplicated()].to_numpy()])
+        aggregates.add(fresh_df)
+
+    # An edited lead's old row is among the dropped ones, matched by identity;
+    # fresh rows without such a match are new
+    identity = LEAD_IDENTITY_COLUMN
+    if identity in fresh_df.columns and identity in old_df.columns:
+        dropped_ids = dropped_df[identity].astype(str).str.strip()
+        fresh_ids = fresh_df[identity].astype(str).str.strip()
+        changed = fresh_ids.isin(dropped_ids)
+        removed = int((~dropped_ids.isin(fresh_ids[changed])).sum())
+        changed = int(changed.sum())
+    else:
+        changed = 0
+        removed = len(dropped_df)
+
+    replace_leads(
+        state,
+        _concat_leads(parts) if len(parts) > 1 else parts[0],
+        key=key,
+        name=name,
+        row_hashes=np.concatenate([row_hashes for _, row_hashes, _ in results]),
+        aggregates=aggregates
+    )
+    if not kept_df.empty:
+        append_leads(state, kept_df)
+    return {
+        'inserted': len(fresh_df) - changed,
+        'changed': changed,
+        'unchanged': len(reused_labels),
+        'removed': removed,
+        'kept': len(kept_df),
+    }
+
+def append_leads(state, scored_df):
+    """
+    Add scored leads to the session overlay
+
+    Args:
+        state: Streamlit session state
+        scored_df (pd.DataFrame): Newly scored leads
+    """
+    overlay = state.lead_overlay
+    start = overlay['next_label']
+    new_rows = scored_df.set_axis(pd.RangeIndex(start, start + len(scored_df)))
+
+    if overlay['added'].empty:
+        added = new_rows
+    else:
+        added = _concat_leads([overlay['added'], new_rows])
+
+    state.lead_overlay = {**overlay, 'added': added, 'next_label': start + len(scored_df)}
+    state.lead_aggregates.add(new_rows)
+    state.leads_version += 1
+
+def remove_leads(state, labels):
+    """
+    Remove leads from the lead book
+
+    Base rows are hidden by the overlay; the shared dataset is untouched.
+
+    Args:
+        state: Streamlit session state
+        labels (list): Row labels of the leads to remove
+    """
+    if not len(labels):
+        return
+
+    overlay = state.lead_overlay
+    labels = pd.Index(labels)
+    added = overlay['added']
+    removed_added = added.loc[labels.intersection(added.index)]
+
+    removed_base = pd.DataFrame(columns=LEAD_COLUMNS)
+    if state.lead_base is not None:
+        base_labels = labels.intersection(state.lead_base.df.index).difference(list(overlay['removed']))
+        removed_base = state.lead_base.df.loc[base_labels]
+
+    state.lead_overlay = {
+        **overlay,
+        'added': added.drop(index=removed_added.index),
+        'removed': overlay['removed'] | frozenset(removed_base.index),
+    }
+    state.lead_aggregates.remove(removed_base)
+    state.lead_aggregates.remove(removed_added)
+    state.leads_version += 1
+
+def rescore_leads(state):
+    """
+    Rescore every lead, e.g. after contact dates have aged
+
+    The base is rescored once per day into a shared derived dataset, so
+    sessions on the same book reuse each other's work.
+
+    Args:
+        state: Streamlit session state
+    """
+    overlay = state.lead_overlay
+    if state.lead_base is None and overlay['added'].empty:
+        return
+
+    if state.lead_base is not None:
+        base = state.lead_base
+        base_key = base.key.split('|rescored:')[0]
+        handle = acquire_dataset(
+            f"{base_key}|rescored:{date.today().isoformat()}",
+            build=lambda: score_leads(base.df),
+            name=base.name,
+            row_hashes=base.row_hashes
+        )
+        _set_base(state, handle)
+        aggregates = handle.aggregates.copy()
+        aggregates.remove(handle.df.loc[list(overlay['removed'])])
+    else:
+        aggregates = LeadAggregates()
+
+    added = overlay['added']
+    if not added.empty:
+        added = score_leads(added)
+        aggregates.add(added)
+
+    state.lead_overlay = {**overlay, 'added': added}
+    state.lead_aggregates = aggregates
+    state.leads_version += 1
@@ -0,0 +1,176 @@
+import io
+import os
+import tempfile
+import weakref
+import zlib
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.lead_scoring import DEFAULT_THRESHOLDS, get_status
+
+# Rows filtered and encoded at a time, which bounds export memory
+EXPORT_CHUNK_ROWS = 50_000
+
+# Export formats: label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+def iter_lead_chunks(df, statuses=None, score_range=None, chunk_rows=EXPORT_CHUNK_ROWS, on_progress=None,
+                     thresholds=DEFAULT_THRESHOLDS):
+    """
+    Filter leads one slice at a time
+
+    Args:
+        df (pd.DataFrame): Scored leads
+        statuses (list, optional): Statuses to keep, all when empty
+        score_range (tuple, optional): Inclusive (min, max) score to keep
+        chunk_rows (int): Rows per slice
+        on_progress (function, optional): Called with the fraction of rows processed
+        thresholds (tuple): (warm, hot) minimum scores; Status is re-bucketed per slice when not the defaults
+
+    Yields:
+        pd.DataFrame: Matching leads from each slice
+    """
+    rebucket = tuple(thresholds) != DEFAULT_THRESHOLDS
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if rebucket and 'Score' in chunk.columns and 'Status' in chunk.columns:
+            chunk = chunk.assign(Status=get_status(chunk['Score'], *thresholds))
+        if statuses and 'Status' in chunk.columns:
+            chunk = chunk[chunk['Status'].isin(statuses)]
+        if score_range is not None and 'Score' in chunk.columns:
+            chunk = chunk[chunk['Score'].between(*score_range)]
+        if not chunk.empty:
+            yield chunk
+        if on_progress is not None:
+            on_progress(min(start + chunk_rows, len(df)) / len(df))
+
+def iter_csv_bytes(chunks):
+    """Encode leads as CSV, header first"""
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+def iter_gzip_bytes(chunks):
+    """Encode leads as gzip-compressed CSV"""
+    compressor = zlib.compressobj(wbits=31)
+    for data in iter_csv_bytes(chunks):
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def _parquet_table(chunk, schema=None):
+    """
+    Convert a chunk of leads to an Arrow table
+
+    Object columns are written as text: they can mix types, e.g. Contact is an
+    int when read from a CSV but a str when entered by hand.
+
+    Args:
+        chunk (pd.DataFrame): Leads
+        schema (pa.Schema, optional): Schema to convert to, inferred when None
+
+    Returns:
+        pa.Table: Converted leads
+    """
+    text_columns = [col for col in chunk.columns if chunk[col].dtype == object]
+    chunk = chunk.assign(**{col: chunk[col].where(chunk[col].isna(), chunk[col].astype(str)) for col in text_columns})
+    if schema is None:
+        schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+        for col in text_columns:
+            schema = schema.set(schema.get_field_index(col), pa.field(col, pa.string()))
+    return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+def iter_parquet_bytes(chunks):
+    """Encode leads as Parquet, one row group per chunk"""
+    sink = io.BytesIO()
+    writer = None
+    for chunk in chunks:
+        if writer is None:
+            table = _parquet_table(chunk)
+            writer = pq.ParquetWriter(sink, table.schema)
+        else:
+            table = _parquet_table(chunk, writer.schema)
+        writer.write_table(table)
+
+        # Hand over what's been written so the buffer never holds more than a row group
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+
+    if writer is not None:
+        writer.close()
+        yield sink.getvalue()
+
+class ExportFile:
+    """
+    A finished export on disk
+
+    The file is deleted when delete() is called or when the object is garbage
+    collected with the session that held it.
+    """
+
+    def __init__(self, path, rows):
+        self.path = path
+        self.rows = rows
+        self._finalizer = weakref.finalize(self, _remove_file, path)
+
+    def open(self):
+        """Open the export for reading"""
+        return open(self.path, 'rb')
+
+    def delete(self):
+        """Delete the file; safe to call more than once"""
+        self._finalizer()
+
+def _remove_file(path):
+    """Delete a file that may already be gone"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+_ENCODERS = {
+    'CSV': iter_csv_bytes,
+    'CSV (gzip)': iter_gzip_bytes,
+    'Parquet': iter_parquet_bytes,
+}
+
+def export_leads(df, export_format, statuses=None, score_range=None, on_progress=None, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Stream filtered leads into a temporary export file
+
+    Args:
+        df (pd.DataFrame): Scored leads
+        export_format (str): One of EXPORT_FORMATS
+        statuses (list, optional): Statuses to keep, all when empty
+        score_range (tuple, optional): Inclusive (min, max) score to keep
+        on_progress (function, optional): Called with the fraction of rows processed
+        thresholds (tuple): (warm, hot) minimum scores for the exported Status
+
+    Returns:
+        ExportFile: The export file and the number of leads in it
+    """
+    extension = EXPORT_FORMATS[export_format][0]
+    exported = 0
+
+    def counted_chunks():
+        nonlocal exported
+        for chunk in iter_lead_chunks(df, statuses, score_range, on_progress=on_progress, thresholds=thresholds):
+            exported += len(chunk)
+            yield chunk
+
+    fd, path = tempfile.mkstemp(prefix='leads-export-', suffix=f'.{extension}')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for data in _ENCODERS[export_format](counted_chunks()):
+                f.write(data)
+    except Exception:
+        os.remove(path)
+        raise
+
+    return ExportFile(path, exported)
@@ -2,13 +2,157 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import re
+from utils.locations import normalize_locations
+from utils.status_thresholds import DEFAULT_THRESHOLDS
 
-def score_leads(df):
+# Scoring rules; what-if variants override individual entries of these
+DEFAULT_SCORING_RULES = {
+    # Every lead starts with a neutral score
+    'base': 50,
+    # Points by days since last contact; bounds are inclusive, None is open-ended
+    'recency': [
+        {'min_days': None, 'max_days': 7, 'points': 20},    # Very recent (within week)
+        {'min_days': 8, 'max_days': 30, 'points': 10},      # Recent (within month)
+        {'min_days': 91, 'max_days': None, 'points': -15},  # Very old contact
+    ],
+    # Points for each keyword found in Product Interest (premium products)
+    'products': {'insurance': 10, 'mutual fund': 10, 'premium': 10, 'gold': 10, 'investment': 10},
+    # Points for each keyword found in Lead Source
+    'sources': {
+        'referral': 15, 'existing customer': 15, 'partner': 15, 'website': 15,
+        'cold call': -5, 'exhibition': -5, 'advertisement': -5,
+    },
+    # Minimum scores for the Warm and Hot statuses
+    'warm_threshold': DEFAULT_THRESHOLDS[0],
+    'hot_threshold': DEFAULT_THRESHOLDS[1],
+}
+
+def merge_scoring_rules(rules=None):
+    """
+    Fill in a partial rule set from the defaults
+
+    Keyword tables are merged key by key, so {'sources': {'referral': 20}}
+    only changes the referral weight; set a keyword to 0 to drop it.
+
+    Args:
+        rules (dict, optional): Overrides of DEFAULT_SCORING_RULES
+
+    Returns:
+        dict: Complete rule set
+    """
+    rules = rules or {}
+    merged = {**DEFAULT_SCORING_RULES, **rules}
+    for key in ('products', 'sources'):
+        merged[key] = {**DEFAULT_SCORING_RULES[key], **rules.get(key, {})}
+    return merged
+
+def _days_since_contact(df):
+    """Whole days since each lead's last contact, or None if unavailable"""
+    if 'Last Contact Date' not in df.columns:
+        return None
+    try:
+        return (pd.to_datetime(datetime.today()) - pd.to_datetime(df['Last Contact Date'])).dt.days
+    except Exception as e:
+        print(f"Error processing Last Contact Date: {e}")
+        return None
+
+def _factorize_text(values):
+    """Codes per row and the distinct lowercased values they point to"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return codes, pd.Index(uniques).astype(str).str.lower()
+
+def score_matrix(df, rule_sets):
+    """
+    Score every lead under several rule sets in one pass
+
+    Each rule only looks at one column, so matches are evaluated once per
+    distinct value (not per row) and shared between rule sets that use the
+    same keyword or recency band. The per-column points are then gathered
+    back to rows for all rule sets at once.
+
+    Args:
+        df (pd.DataFrame): Leads
+        rule_sets (list): Rule sets, each a (partial) DEFAULT_SCORING_RULES
+
+    Returns:
+        np.ndarray: Scores from 0 to 100, one row per lead and one column per rule set
+    """
+    rule_sets = [merge_scoring_rules(rules) for rules in rule_sets]
+    scores = np.tile(np.array([rules['base'] for rules in rule_sets], dtype=np.int64), (len(df), 1))
+
+    # Keyword points: distinct values x rule sets, gathered to rows by code
+    for column, key in (('Product Interest', 'products'), ('Lead Source', 'sources')):
+        if column not in df.columns:
+            continue
+        codes, uniques = _factorize_text(df[column])
+        matches = {}
+        points = np.zeros((len(uniques), len(rule_sets)), dtype=np.int64)
+        for k, rules in enumerate(rule_sets):
+            for keyword, keyword_points in rules[key].items():
+                if keyword not in matches:
+                    matches[keyword] = np.asarray(uniques.str.contains(keyword, regex=False), dtype=bool)
+                points[matches[keyword], k] += keyword_points
+        scores += points[codes]
+
+    # Recency points: one band check per distinct day count
+    days = _days_since_contact(df)
+    if days is not None:
+        codes, uniques = pd.factorize(days, use_na_sentinel=False)
+        unique_days = np.asarray(uniques, dtype=float)
+        matches = {}
+        points = np.zeros((len(uniques), len(rule_sets)), dtype=np.int64)
+        for k, rules in enumerate(rule_sets):
+            for band in rules['recency']:
+                bounds = (band.get('min_days'), band.get('max_days'))
+                if bounds not in matches:
+                    in_band = ~np.isnan(unique_days)
+                    if bounds[0] is not None:
+                        in_band &= unique_days >= bounds[0]
+                    if bounds[1] is not None:
+                        in_band &= unique_days <= bounds[1]
+                    matches[bounds] = in_band
+                points[matches[bounds], k] += band['points']
+        scores += points[codes]
+
+    return np.clip(scores, 0, 100)
+
+def get_status(scores, warm_threshold=DEFAULT_THRESHOLDS[0], hot_threshold=DEFAULT_THRESHOLDS[1]):
+    """
+    Bucket scores into Hot, Warm and Cold
+
+    Args:
+        scores (array-like): Lead scores
+        warm_threshold (int): Minimum Warm score
+        hot_threshold (int): Minimum Hot score
+
+    Returns:
+        np.ndarray: Status per score
+    """
+    scores = np.asarray(scores)
+    return np.where(scores >= hot_threshold, 'Hot', np.where(scores >= warm_threshold, 'Warm', 'Cold')).astype(object)
+
+def apply_status_thresholds(df, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Re-bucket leads' Status from their existing scores
+
+    Args:
+        df (pd.DataFrame): Scored leads
+        thresholds (tuple): (warm, hot) minimum scores
+
+    Returns:
+        pd.DataFrame: Leads with Status recomputed, or df itself if unchanged
+    """
+    if df.empty or 'Score' not in df.columns or tuple(thresholds) == DEFAULT_THRESHOLDS:
+        return df
+    return df.assign(Status=get_status(df['Score'], *thresholds))
+
+def score_leads(df, rules=None):
     """
     Score leads based on various factors like recency, product interest, location
     
     Args:
         df (pd.DataFrame): DataFrame containing lead information
+        rules (dict, optional): Scoring rules, DEFAULT_SCORING_RULES when None
     
     Returns:
         pd.DataFrame: DataFrame with added Score and Status columns
@@ -17,65 +161,66 @@ def score_leads(df):
     if df.empty:
         return df
     
+    rules = merge_scoring_rules(rules)
+    
     # Create a copy to avoid SettingWithCopyWarning
     scored_df = df.copy()
     
-    # Initialize score column
-    scored_df['Score'] = 50  # Start with neutral score
-    
-    # Score based on Last Contact Date (recency)
-    # More recent contacts get higher scores
     if 'Last Contact Date' in scored_df.columns:
         try:
             scored_df['Last Contact Date'] = pd.to_datetime(scored_df['Last Contact Date'])
-            today = pd.to_datetime(datetime.today())
-            
-            # Calculate days since last contact
-            scored_df['Days Since Contact'] = (today - scored_df['Last Contact Date']).dt.days
-            
-            # Score based on recency (higher for more recent contacts)
-            scored_df.loc[scored_df['Days Since Contact'] <= 7, 'Score'] += 20  # Very recent (within week)
-            scored_df.loc[(scored_df['Days Since Contact'] > 7) & (scored_df['Days Since Contact'] <= 30), 'Score'] += 10  # Recent (within month)
-            scored_df.loc[scored_df['Days Since Contact'] > 90, 'Score'] -= 15  # Very old contact
-            
-            # Drop the temporary column
-            scored_df = scored_df.drop('Days Since Contact', axis=1)
         except Exception as e:
             print(f"Error processing Last Contact Date: {e}")
     
-    # Score based on Product Interest
-    if 'Product Interest' in scored_df.columns:
-        # Example: Higher score for premium products
-        premium_products = ['insurance', 'mutual fund', 'premium', 'gold', 'investment']
-        scored_df['Product Interest'] = scored_df['Product Interest'].astype(str).str.lower()
-        
-        for product in premium_products:
-            scored_df.loc[scored_df['Product Interest'].str.contains(product), 'Score'] += 10
-    
-    # Score based on Lead Source
-    if 'Lead Source' in scored_df.columns:
-        # Example: Higher score for referrals which typically convert better
-        high_quality_sources = ['referral', 'existing customer', 'partner', 'website']
-        scored_df['Lead Source'] = scored_df['Lead Source'].astype(str).str.lower()
-        
-        for source in high_quality_sources:
-            scored_df.loc[scored_df['Lead Source'].str.contains(source), 'Score'] += 15
-            
-        # Lower score for cold sources
-        cold_sources = ['cold call', 'exhibition', 'advertisement']
-        for source in cold_sources:
-            scored_df.loc[scored_df['Lead Source'].str.contains(source), 'Score'] -= 5
+    # Keyword rules match on lowercase text
+    for col in ['Product Interest', 'Lead Source']:
+        if col in scored_df.columns:
+            scored_df[col] = scored_df[col].astype(str).str.lower()
     
-    # Ensure scores are within 0-100 range
-    scored_df['Score'] = scored_df['Score'].clip(0, 100)
+    scored_df['Score'] = score_matrix(scored_df, [rules])[:, 0]
     
     # Categorize the leads based on scores
-    scored_df['Status'] = 'Cold'
-    scored_df.loc[scored_df['Score'] >= 50, 'Status'] = 'Warm'
-    scored_df.loc[scored_df['Score'] >= 80, 'Status'] = 'Hot'
+    scored_df['Status'] = get_status(scored_df['Score'], rules['warm_threshold'], rules['hot_threshold'])
     
     return scored_df
 
+def compare_scoring_rules(df, variants):
+    """
+    Compare how Hot/Warm/Cold counts shift under alternative scoring rules
+
+    All variants are scored together by score_matrix, so comparing many
+    costs about the same as scoring once.
+
+    Args:
+        df (pd.DataFrame): Leads
+        variants (dict): Variant name -> (partial) rule set; the first is the baseline
+
+    Returns:
+        pd.DataFrame: Per variant: Hot, Warm and Cold counts, their change from
+            the baseline, average score and how many leads change status
+    """
+    names = list(variants)
+    rule_sets = [merge_scoring_rules(variants[name]) for name in names]
+    scores = score_matrix(df, rule_sets)
+
+    # Status as 0 (Cold), 1 (Warm) or 2 (Hot) per lead and variant
+    warm_thresholds = np.array([rules['warm_threshold'] for rules in rule_sets])
+    hot_thresholds = np.array([rules['hot_threshold'] for rules in rule_sets])
+    levels = (scores >= warm_thresholds).astype(np.int8) + (scores >= hot_thresholds)
+
+    comparison = pd.DataFrame({
+        'Hot': (levels == 2).sum(axis=0),
+        'Warm': (levels == 1).sum(axis=0),
+        'Cold': (levels == 0).sum(axis=0),
+        'Avg Score': scores.mean(axis=0).round(1) if len(df) else np.zeros(len(names)),
+    }, index=pd.Index(names, name='Variant'))
+
+    for status in ['Hot', 'Warm', 'Cold']:
+        comparison[f'{status} Change'] = comparison[status] - comparison[status].iloc[0]
+    comparison['Status Changed'] = (levels != levels[:, :1]).sum(axis=0)
+
+    return comparison
+
 def validate_lead_data(df):
     """
     Validate the lead data for required fields and format
@@ -133,7 +278,15 @@ def preprocess_lead_data(df):
     if 'Lead Source' in cleaned_df.columns:
         cleaned_df['Lead Source'].fillna('Other', inplace=True)
         
+    if 'Contact' in cleaned_df.columns:
+        # Numbers are text, as when typed in by hand, however read_csv parsed them
+        contact = cleaned_df['Contact']
+        if pd.api.types.is_float_dtype(contact) and (contact.dropna() % 1 == 0).all():
+            contact = contact.astype('Int64')
+        cleaned_df['Contact'] = contact.astype(object).where(contact.isna(), contact.astype(str))
+
     if 'Location' in cleaned_df.columns:
-        cleaned_df['Location'].fillna('Unknown', inplace=True)
+        # Canonical city names, stored as integer codes
+        cleaned_df['Location'] = normalize_locations(cleaned_df['Location'])
     
     return cleaned_df
@@ -0,0 +1,240 @@
+import re
+from itertools import chain
+import numpy as np
+import pandas as pd
+
+# Columns the leads table can be searched by
+SEARCH_COLUMNS = ['Name', 'Contact', 'Location']
+
+# Substring search finds tokens through their n-grams of this many bytes
+NGRAM_SIZE = 3
+
+# Tokens and search terms are cut to this many UTF-8 bytes
+MAX_TOKEN_BYTES = 24
+
+# Tokens whose n-grams are extracted at once, which bounds memory while indexing
+NGRAM_BLOCK = 200_000
+
+_WORD = re.compile(r'\w+')
+
+def _column_tokens(values, join_digits=False):
+    """
+    Tokens of a column and the row position each came from, tokenizing each distinct value once
+
+    With join_digits, the digits of a multi-word value are also kept as one token.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+
+    # Lowercase words of each distinct value
+    token_lists = [_WORD.findall(text) for text in pd.Series(uniques, dtype=object).astype(str).str.casefold()]
+    if join_digits:
+        # '+91 98765 43210' is also found as '919876543210'
+        for tokens in token_lists:
+            if len(tokens) > 1:
+                digits = ''.join(token for token in tokens if token.isdigit())
+                if digits:
+                    tokens.append(digits)
+    counts = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+    starts = np.cumsum(counts) - counts
+    flat = np.array(list(chain.from_iterable(token_lists)), dtype=object)
+
+    rows = np.flatnonzero(codes >= 0)
+    codes = codes[rows]
+    row_counts = counts[codes]
+    # Position in flat of each row's tokens, laid out row after row
+    positions = (
+        np.arange(row_counts.sum())
+        - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+        + np.repeat(starts[codes], row_counts)
+    )
+    return flat[positions], np.repeat(rows, row_counts)
+
+def _build_ngram_keys(vocab):
+    """Sorted (n-gram << 32 | token id) keys for every distinct n-gram of every token"""
+    width = vocab.dtype.itemsize
+    keys = [np.empty(0, dtype=np.uint64)]
+    for start in range(0, len(vocab), NGRAM_BLOCK):
+        block = vocab[start:start + NGRAM_BLOCK]
+        chars = block.view(np.uint8).reshape(len(block), width).astype(np.uint64)
+        token_ids = np.arange(start, start + len(block), dtype=np.uint64)
+        for i in range(width - NGRAM_SIZE + 1):
+            # Tokens are null-padded, so an n-gram ending in a null is past the token's end
+            present = chars[:, i + NGRAM_SIZE - 1] != 0
+            gram = np.zeros(present.sum(), dtype=np.uint64)
+            for j in range(NGRAM_SIZE):
+                gram = (gram << np.uint64(8)) | chars[present, i + j]
+            keys.append((gram << np.uint64(32)) | token_ids[present])
+    return np.unique(np.concatenate(keys))
+
+class SearchIndex:
+    """
+    Search index over the Name, Contact and Location of a set of leads
+
+    Distinct lowercase words are kept sorted, so a prefix is a binary search
+    for a contiguous run of words, and each word's n-grams are indexed, so a
+    substring is an intersection of n-gram lists. Words map to row labels
+    through posting lists; the DataFrame itself is never scanned.
+    """
+
+    def __init__(self, df):
+        """
+        Args:
+            df (pd.DataFrame): Leads to index
+        """
+        tokens, rows = [np.empty(0, dtype=object)], [np.empty(0, dtype=np.int64)]
+        for col in SEARCH_COLUMNS:
+            if col in df.columns:
+                col_tokens, col_rows = _column_tokens(df[col], join_digits=col == 'Contact')
+                tokens.append(col_tokens)
+                rows.append(col_rows)
+        tokens = np.concatenate(tokens)
+        rows = np.concatenate(rows)
+
+        # Sorted vocabulary of UTF-8 words; byte order matches character order
+        codes, uniques = pd.factorize(tokens)
+        encoded = np.array(
+            [token.encode('utf-8')[:MAX_TOKEN_BYTES] for token in uniques],
+            dtype=f'S{MAX_TOKEN_BYTES}'
+        )
+        self.vocab, inverse = np.unique(encoded, return_inverse=True)
+        token_ids = inverse.reshape(-1)[codes]
+
+        # Row labels grouped by word id; offsets[i]:offsets[i + 1] are word i's rows
+        order = np.argsort(token_ids, kind='stable')
+        self.postings = df.index.to_numpy()[rows[order]]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(token_ids, minlength=len(self.vocab)))])
+
+        self.ngram_keys = _build_ngram_keys(self.vocab)
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def _ngram_tokens(self, gram):
+        """Ids of the words containing one n-gram"""
+        code = int.from_bytes(gram, 'big')
+        lo, hi = np.searchsorted(self.ngram_keys, np.array([code, code + 1], dtype=np.uint64) << np.uint64(32))
+        return (self.ngram_keys[lo:hi] & np.uint64(0xFFFFFFFF)).astype(np.int64)
+
+    def _term_tokens(self, term):
+        """Ids of the words matching a search term"""
+        if len(term) < NGRAM_SIZE:
+            # Too short for n-grams: words starting with the term, a contiguous run of the vocabulary
+            lo, hi = np.searchsorted(self.vocab, [term, term + b'\xff'])
+            return np.arange(lo, hi)
+
+        grams = [self._ngram_tokens(term[i:i + NGRAM_SIZE]) for i in range(len(term) - NGRAM_SIZE + 1)]
+        grams.sort(key=len)
+        token_ids = grams[0]
+        for gram_tokens in grams[1:]:
+            if not len(token_ids):
+                break
+            token_ids = np.intersect1d(token_ids, gram_tokens, assume_unique=True)
+
+        if len(term) > NGRAM_SIZE and len(token_ids):
+            # Every n-gram matching doesn't mean they're adjacent
+            token_ids = token_ids[np.char.find(self.vocab[token_ids], term) >= 0]
+        return token_ids
+
+    def _token_rows(self, token_ids):
+        """Row labels of the leads with any of the words"""
+        starts = self.offsets[token_ids]
+        counts = self.offsets[token_ids + 1] - starts
+        positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        return self.postings[positions]
+
+    def search(self, terms):
+        """
+        Find the leads matching every term
+
+        Args:
+            terms (list): Lowercase UTF-8 search terms, see parse_search
+
+        Returns:
+            np.ndarray: Sorted row labels
+        """
+        labels = None
+        for term in terms:
+            rows = np.unique(self._token_rows(self._term_tokens(term)))
+            labels = rows if labels is None else np.intersect1d(labels, rows, assume_unique=True)
+            if not len(labels):
+                break
+        return labels if labels is not None else np.empty(0, dtype=self.postings.dtype)
+
+def parse_search(query):
+    """
+    Split a search box query into terms
+
+    Args:
+        query (str): Text typed by the user
+
+    Returns:
+        list: Lowercase UTF-8 terms; a lead must contain all of them
+    """
+    return [term.encode('utf-8')[:MAX_TOKEN_BYTES] for term in _WORD.findall(query.casefold())]
+
+def get_search_index(state):
+    """
+    Get the search indexes for the session's lead book
+
+    The shared base dataset is indexed once for every session using it; leads
+    the session adds are indexed in small segments as they arrive.
+
+    Args:
+        state: Streamlit session state
+
+    Returns:
+        list: SearchIndex segments covering the book
+    """
+    base = state.lead_base
+    overlay = state.lead_overlay
+    base_key = base.key if base is not None else None
+
+    cache = state.get('lead_search')
+    if cache is None or cache['base_key'] != base_key or overlay['next_label'] < cache['indexed_upto']:
+        cache = {
+            'base_key': base_key,
+            'segments': [base.get_derived('search_index', SearchIndex)] if base is not None else [],
+            'indexed_upto': len(base.df) if base is not None else 0,
+            'version': None,
+        }
+        state.lead_search = cache
+
+    if cache['version'] != state.leads_version:
+        added = overlay['added']
+        new_rows = added[added.index >= cache['indexed_upto']]
+        if not new_rows.empty:
+            cache['segments'].append(SearchIndex(new_rows))
+        cache['indexed_upto'] = overlay['next_label']
+        cache['version'] = state.leads_version
+    return cache['segments']
+
+def search_leads(state, query):
+    """
+    Find the leads whose Name, Contact or Location contain every word of a query
+
+    Args:
+        state: Streamlit session state
+        query (str): Text typed by the user
+
+    Returns:
+        pd.Index: Row labels of the matching leads, in book order
+    """
+    terms = parse_search(query)
+    if not terms:
+        return pd.Index([], dtype='int64')
+
+    overlay = state.lead_overlay
+    labels = np.concatenate([np.empty(0, dtype=np.int64)] + [segment.search(terms) for segment in get_search_index(state)])
+
+    # Leave out leads removed since they were indexed
+    base_rows = len(state.lead_base.df) if state.lead_base is not None else 0
+    is_base = labels < base_rows
+    keep = np.where(
+        is_base,
+        ~np.isin(labels, list(overlay['removed'])),
+        np.isin(labels, overlay['added'].index.to_numpy())
+    )
+    return pd.Index(labels[keep])
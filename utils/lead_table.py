@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from utils.lead_scoring import DEFAULT_THRESHOLDS, get_status
+
+# Row background per lead status; anything else is styled as Cold
+STATUS_STYLES = {
+    'Hot': 'background-color: #d4edda',
+    'Warm': 'background-color: #fff3cd',
+    'Cold': 'background-color: #f8d7da',
+}
+
+def query_leads(df, statuses=None, sort_by=None, ascending=True, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Filter and sort leads, returning only the matching row labels in order
+
+    Args:
+        df (pd.DataFrame): Leads
+        statuses (list, optional): Statuses to keep, all when empty
+        sort_by (str, optional): Column to sort by, original order when None
+        ascending (bool): Sort direction
+        thresholds (tuple): (warm, hot) minimum scores that decide each lead's Status
+
+    Returns:
+        pd.Index: Row labels of the matching leads, in display order
+    """
+    status = df['Status'] if 'Status' in df.columns else None
+    if status is not None and tuple(thresholds) != DEFAULT_THRESHOLDS and 'Score' in df.columns:
+        # Re-bucket from the stored scores rather than trusting the default-threshold Status
+        status = pd.Series(get_status(df['Score'], *thresholds), index=df.index, name='Status')
+
+    rows = df
+    if statuses and status is not None:
+        rows = df[status.isin(statuses).to_numpy()]
+
+    if sort_by and sort_by in rows.columns:
+        column = status.loc[rows.index] if sort_by == 'Status' else rows[sort_by]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Order the categories by name so the integer codes sort alphabetically
+            column = column.cat.reorder_categories(column.cat.categories.sort_values(), ordered=True)
+
+        # Sort just the one column; the full frame is only sliced per page
+        return column.sort_values(ascending=ascending, kind='stable', na_position='last').index
+    return rows.index
+
+def get_page(df, row_labels, page, page_size):
+    """
+    Slice one page of leads
+
+    Args:
+        df (pd.DataFrame): Leads
+        row_labels (pd.Index): Matching row labels in display order
+        page (int): Page number, starting at 1
+        page_size (int): Rows per page
+
+    Returns:
+        pd.DataFrame: Leads on the page
+    """
+    start = (page - 1) * page_size
+    return df.loc[row_labels[start:start + page_size]]
+
+def status_styles(page_df):
+    """
+    Row styles for a page of leads, computed for all rows at once
+
+    Args:
+        page_df (pd.DataFrame): Leads on the page
+
+    Returns:
+        pd.DataFrame: CSS per cell, for Styler.apply(axis=None)
+    """
+    if 'Status' in page_df.columns:
+        row_styles = page_df['Status'].map(STATUS_STYLES).fillna(STATUS_STYLES['Cold']).to_numpy()
+    else:
+        row_styles = np.full(len(page_df), '', dtype=object)
+
+    return pd.DataFrame(
+        np.repeat(row_styles[:, None], page_df.shape[1], axis=1),
+        index=page_df.index,
+        columns=page_df.columns
+    )
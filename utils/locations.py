@@ -0,0 +1,221 @@
+import difflib
+import json
+import os
+import re
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+# Canonical city names and their known alternative spellings
+LOCATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locations.json')
+
+# Spellings resolved by fuzzy matching, kept across restarts
+ALIAS_CACHE_PATH = os.environ.get(
+    'LOCATION_ALIAS_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'gromo-sales-coach', 'location_aliases.json')
+)
+
+# Minimum similarity (0-1) for an unseen spelling to map onto a seeded one.
+# One wrong letter in a short name stays below it, so Raipur isn't read as Jaipur.
+FUZZY_CUTOFF = 0.9
+
+# Largest length difference between a spelling and a fuzzy match candidate
+FUZZY_LENGTH_SLACK = 2
+
+# Location used for blank values
+UNKNOWN_LOCATION = 'Unknown'
+
+# Unmatched spellings become canonical names for this process only, up to
+# this many; past it they map to OTHER_LOCATION so the table stays bounded
+MAX_UNMATCHED_LOCATIONS = 500
+OTHER_LOCATION = 'Other'
+
+# Alias cache layout; caches from other versions are ignored
+ALIAS_CACHE_VERSION = 2
+
+# Canonical names, interned; a city's position here is its integer code.
+# The table only grows, so codes handed out earlier stay valid.
+_canonical = []
+_canonical_ids = {}
+# normalized spelling -> canonical id
+_aliases = {}
+# Fuzzy match candidates from locations.json: first letter -> normalized spellings
+_seeded = {}
+# Canonical ids of the seeded cities; only these are saved to the alias cache
+_seeded_ids = set()
+_unmatched_count = 0
+# Aliases learned since startup that still need saving
+_learned = {}
+_lock = threading.Lock()
+
+def _normalize_key(value):
+    """Lowercase a spelling and strip punctuation and extra whitespace"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    text = re.sub(r'[^\w\s/-]', ' ', str(value).casefold())
+    return ' '.join(text.split())
+
+def _add_canonical(name):
+    """Register a canonical name and return its id"""
+    name = sys.intern(name)
+    if name not in _canonical_ids:
+        _canonical_ids[name] = len(_canonical)
+        _canonical.append(name)
+        _aliases.setdefault(_normalize_key(name), _canonical_ids[name])
+    return _canonical_ids[name]
+
+def _load_table():
+    """Seed the canonical table from locations.json and the alias cache"""
+    try:
+        with open(LOCATIONS_PATH, "r") as f:
+            seed = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading locations: {e}")
+        seed = {}
+
+    _seeded_ids.add(_add_canonical(UNKNOWN_LOCATION))
+    _seeded_ids.add(_add_canonical(OTHER_LOCATION))
+    for name, spellings in seed.items():
+        canonical_id = _add_canonical(name)
+        _seeded_ids.add(canonical_id)
+        for spelling in [name] + spellings:
+            key = _normalize_key(spelling)
+            _aliases[key] = canonical_id
+            if key:
+                _seeded.setdefault(key[0], []).append(key)
+
+    try:
+        with open(ALIAS_CACHE_PATH, "r") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+    if not isinstance(cached, dict) or cached.get('version') != ALIAS_CACHE_VERSION:
+        cached = {}
+
+    for spelling, name in cached.get('aliases', {}).items():
+        if name in _canonical_ids and _canonical_ids[name] in _seeded_ids:
+            _aliases.setdefault(spelling, _canonical_ids[name])
+
+def _save_aliases():
+    """Write newly learned aliases to the alias cache; failures only cost a re-match later"""
+    with _lock:
+        if not _learned:
+            return
+        aliases = {
+            spelling: _canonical[canonical_id]
+            for spelling, canonical_id in _aliases.items()
+            if spelling and canonical_id in _seeded_ids
+        }
+        _learned.clear()
+
+    try:
+        os.makedirs(os.path.dirname(ALIAS_CACHE_PATH), exist_ok=True)
+        tmp_path = f"{ALIAS_CACHE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({'version': ALIAS_CACHE_VERSION, 'aliases': aliases}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, ALIAS_CACHE_PATH)
+    except OSError as e:
+        print(f"Error writing location alias cache: {e}")
+
+def _match_seeded(key):
+    """Closest seeded spelling with the same first letter and a similar length, or None"""
+    candidates = [
+        spelling for spelling in _seeded.get(key[:1], ())
+        if abs(len(spelling) - len(key)) <= FUZZY_LENGTH_SLACK
+    ]
+    matches = difflib.get_close_matches(key, candidates, n=1, cutoff=FUZZY_CUTOFF)
+    return matches[0] if matches else None
+
+def _resolve_id(value):
+    """Canonical id for one raw spelling, fuzzy matching it the first time it's seen"""
+    global _unmatched_count
+    key = _normalize_key(value)
+    canonical_id = _aliases.get(key)
+    if canonical_id is not None:
+        return canonical_id
+
+    with _lock:
+        if key in _aliases:
+            return _aliases[key]
+
+        match = _match_seeded(key)
+        if match is not None:
+            canonical_id = _aliases[match]
+            _learned[key] = canonical_id
+        elif _unmatched_count < MAX_UNMATCHED_LOCATIONS:
+            canonical_id = _add_canonical(' '.join(str(value).split()).title())
+            _unmatched_count += 1
+        else:
+            canonical_id = _canonical_ids[OTHER_LOCATION]
+
+        _aliases[key] = canonical_id
+        return canonical_id
+
+def resolve_location(value):
+    """
+    Get the canonical name for a location spelling
+
+    Args:
+        value: Raw Location value, e.g. ' bombay'
+
+    Returns:
+        str: Canonical city name, e.g. 'Mumbai'
+    """
+    canonical_id = _resolve_id(value)
+    _save_aliases()
+    return _canonical[canonical_id]
+
+def get_location_categories():
+    """
+    Get the canonical city table
+
+    Returns:
+        pd.Index: Canonical names in code order
+    """
+    with _lock:
+        return pd.Index(list(_canonical))
+
+def normalize_locations(values):
+    """
+    Map raw Location values to canonical cities stored as integer codes
+
+    Each distinct spelling is resolved once; rows only carry its code.
+
+    Args:
+        values (pd.Series): Raw Location values
+
+    Returns:
+        pd.Series: Categorical over the canonical city table
+    """
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=False)
+    unique_ids = np.array([_resolve_id(value) for value in uniques], dtype=np.int32)
+    _save_aliases()
+
+    categories = get_location_categories()
+    return pd.Series(
+        pd.Categorical.from_codes(unique_ids[codes], categories=categories),
+        index=values.index,
+        name=values.name
+    )
+
+def align_locations(values):
+    """
+    Point a Location column at the current city table so frames concatenate as codes
+
+    Args:
+        values (pd.Series): Location column, categorical or raw
+
+    Returns:
+        pd.Series: Categorical over the current canonical city table
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return normalize_locations(values)
+
+    categories = get_location_categories()
+    if len(values.cat.categories) == len(categories):
+        return values
+    # Earlier tables are a prefix of the current one, so the codes don't change
+    return values.cat.set_categories(categories)
+
+_load_table()
@@ -0,0 +1,35 @@
+import importlib
+import sys
+import time
+
+# Seconds each page module took to import, recorded on its first import in this process
+_import_times = {}
+
+def load_page(module_name, function_name):
+    """
+    Import a page module on first use and return its render function
+
+    Args:
+        module_name (str): Dotted module path, e.g. 'pages.dashboard'
+        function_name (str): Name of the page's render function
+
+    Returns:
+        function: Page render function
+    """
+    if module_name not in sys.modules:
+        start = time.perf_counter()
+        importlib.import_module(module_name)
+        _import_times[module_name] = time.perf_counter() - start
+    return getattr(sys.modules[module_name], function_name)
+
+def get_import_time(module_name):
+    """
+    Get how long a page module took to import
+
+    Args:
+        module_name (str): Dotted module path
+
+    Returns:
+        float: Import time in seconds, or 0.0 if it was loaded by something else
+    """
+    return _import_times.get(module_name, 0.0)
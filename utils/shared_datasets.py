@@ -0,0 +1,104 @@
+import threading
+import weakref
+from utils.lead_aggregates import LeadAggregates
+
+# Process-wide registry: key -> {'name', 'df', 'aggregates', 'row_hashes', 'derived', 'refs'}
+_registry = {}
+_registry_lock = threading.Lock()
+
+class DatasetHandle:
+    """
+    A session's reference to a shared lead dataset
+
+    The dataset is released when release() is called or when the handle is
+    garbage collected with the session that held it.
+    """
+
+    def __init__(self, key, entry):
+        self.key = key
+        self.name = entry['name']
+        self.df = entry['df']
+        self.aggregates = entry['aggregates']
+        # Content hash of the uploaded row behind each lead, or None
+        self.row_hashes = entry['row_hashes']
+        self._derived = entry['derived']
+        self._finalizer = weakref.finalize(self, _release, key)
+
+    def release(self):
+        """Drop this reference; safe to call more than once"""
+        self._finalizer()
+
+    def get_derived(self, name, build):
+        """
+        Get data derived from the dataset, built once and shared by every session
+
+        Args:
+            name (str): Name of the derived data, e.g. 'search_index'
+            build (function): Called with the DataFrame if it hasn't been built yet
+
+        Returns:
+            The derived data
+        """
+        with _registry_lock:
+            value = self._derived.get(name)
+        if value is None:
+            # Build outside the lock; if another session won the race, use its copy
+            value = build(self.df)
+            with _registry_lock:
+                value = self._derived.setdefault(name, value)
+        return value
+
+def _release(key):
+    """Decrement a dataset's reference count and drop it once unused"""
+    with _registry_lock:
+        entry = _registry.get(key)
+        if entry is None:
+            return
+        entry['refs'] -= 1
+        if entry['refs'] <= 0:
+            del _registry[key]
+
+def acquire_dataset(key, build=None, name=None, row_hashes=None, aggregates=None):
+    """
+    Get a handle to a shared dataset, building and registering it on first use
+
+    The DataFrame is shared by every session holding a handle and must be
+    treated as read-only; sessions keep their own edits in an overlay.
+    Looking up and acquiring happen under one lock, so a dataset can't be
+    dropped by another session in between.
+
+    Args:
+        key (str): Dataset key, e.g. a content hash of the uploaded file
+        build (function, optional): Returns the scored DataFrame if the key isn't loaded
+        name (str, optional): Display name for the dataset
+        row_hashes (np.ndarray, optional): Content hash of the raw row behind each built lead
+        aggregates (LeadAggregates, optional): Counts over the built DataFrame; computed from it when None
+
+    Returns:
+        DatasetHandle: Handle to the shared dataset, or None if it isn't loaded and build is None
+    """
+    with _registry_lock:
+        entry = _registry.get(key)
+        if entry is not None:
+            entry['refs'] += 1
+            return DatasetHandle(key, entry)
+
+    if build is None:
+        return None
+
+    # Build outside the lock; if another session won the race, use its copy
+    df = build()
+    if aggregates is None:
+        aggregates = LeadAggregates.from_frame(df)
+
+    with _registry_lock:
+        entry = _registry.setdefault(key, {
+            'name': name or key,
+            'df': df,
+            'aggregates': aggregates,
+            'row_hashes': row_hashes,
+            'derived': {},
+            'refs': 0,
+        })
+        entry['refs'] += 1
+        return DatasetHandle(key, entry)
@@ -0,0 +1,17 @@
+# No imports: the app shell reads these on every page, Home included, and
+# shouldn't load pandas to do it
+
+# (warm, hot) minimum scores of the default scoring rules
+DEFAULT_THRESHOLDS = (50, 80)
+
+def get_status_thresholds(state):
+    """
+    Get the team's Warm and Hot cutoffs
+
+    Args:
+        state: Streamlit session state
+
+    Returns:
+        tuple: (warm, hot) minimum scores
+    """
+    return state.get('status_thresholds', DEFAULT_THRESHOLDS)